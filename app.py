@@ -1,12 +1,21 @@
+import asyncio
 import time
 import streamlit as st
 import logging
-from typing import Optional, Dict, Any
+from typing import Dict
+
+# Faster libuv-backed event loop for the async fetchers (Linux/macOS only)
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 from assistant.query_handler import QueryHandler
-from assistant.data_fetcher import DataFetcher
-from assistant.response_generator import ResponseGenerator
+from assistant.data_fetcher import DataFetcher, MarketSnapshot, PriceSnapshot
+from assistant.response_generator import get_response_generator
 from assistant.config import Config
-from assistant.utils import format_currency, format_percentage
+from assistant.utils import format_percentage
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,39 +36,51 @@ def initialize_components():
     config = Config()
     query_handler = QueryHandler()
     data_fetcher = DataFetcher(config)
-    response_generator = ResponseGenerator(config)
+    response_generator = get_response_generator(config)
     return query_handler, data_fetcher, response_generator
 
-def display_market_data(market_data: Dict[str, Any], price_data: Dict[str, Any]):
-    """Display market data in a structured format"""
+@st.cache_data(ttl=300, show_spinner=False)  # Cache for 5 minutes
+def fetch_token_data(token_info: Dict[str, str]) -> tuple:
+    """Fetch all data for a token, cached so repeat queries skip the network"""
+    _, data_fetcher, _ = initialize_components()
+    return asyncio.run(data_fetcher.fetch_all(token_info))
+
+@st.fragment
+def display_market_data(market_data: "MarketSnapshot", price_data: "PriceSnapshot"):
+    """Display market data in a structured format
+
+    Runs as a fragment so widget interactions elsewhere on the page do
+    not re-render the metric cards.
+    """
     col1, col2, col3, col4 = st.columns(4)
-    
+
     with col1:
         st.metric(
-            "Current Price", 
-            f"${format_currency(price_data.get('price', 0))}"
+            "Current Price",
+            f"${price_data:cur}"
         )
-    
+
     with col2:
         st.metric(
-            "Market Cap", 
-            f"${format_currency(market_data.get('market_cap', 0))}"
+            "Market Cap",
+            f"${market_data:cur}"
         )
-    
+
     with col3:
         st.metric(
-            "Market Rank", 
-            f"#{market_data.get('rank', 'N/A')}"
+            "Market Rank",
+            f"#{market_data.rank}"
         )
-    
+
     with col4:
-        change_24h = market_data.get('price_change_24h', 0)
+        change_24h = market_data.price_change_24h
         st.metric(
             "24h Change",
             f"{format_percentage(change_24h)}%",
             delta=f"{change_24h:.2f}%"
         )
 
+@st.fragment
 def display_news(news_data: list):
     """Display news in an organized format"""
     if not news_data or not any(news_data):
@@ -68,11 +89,34 @@ def display_news(news_data: list):
     
     st.subheader("📰 Latest News")
     for i, article in enumerate(news_data[:5]):  # Show top 5 articles
-        with st.expander(f"Article {i+1}: {article.get('title', 'No title')[:100]}..."):
-            st.write(f"**Published:** {article.get('published_at', 'Unknown')}")
-            st.write(f"**Title:** {article.get('title', 'No title')}")
-            if article.get('url'):
-                st.write(f"**Link:** [Read more]({article['url']})")
+        with st.expander(f"Article {i+1}: {article.title[:100]}..."):
+            st.write(f"**Published:** {article.published_at}")
+            st.write(f"**Title:** {article.title}")
+            if article.url and article.url != "#":
+                st.write(f"**Link:** [Read more]({article.url})")
+
+def display_analysis_results():
+    """Render the stored analysis in tabs from session state"""
+    analysis = st.session_state.analysis
+    tab1, tab2, tab3 = st.tabs(["📊 Market Data", "📰 News", "🤖 AI Analysis"])
+
+    with tab1:
+        display_market_data(analysis['market_data'], analysis['price_data'])
+
+    with tab2:
+        display_news(analysis['news_data'])
+
+    with tab3:
+        st.markdown("### 🤖 AI Analysis")
+        st.markdown(analysis['ai_response'])
+
+        # Download option
+        st.download_button(
+            label="📥 Download Analysis",
+            data=analysis['ai_response'],
+            file_name=f"{analysis['token_info']['name']}_analysis_{int(time.time())}.txt",
+            mime="text/plain"
+        )
 
 def main():
     st.title("🧠 AI Crypto Assistant")
@@ -147,76 +191,72 @@ def main():
                 
                 st.success(f"✅ Identified: {token_info['name']} ({token_info['symbol']})")
                 progress_bar.progress(20)
-                
-                # Create data containers
-                data_container = st.container()
-                
-                with data_container:
-                    # Create tabs for different data types
-                    tab1, tab2, tab3 = st.tabs(["📊 Market Data", "📰 News", "🤖 AI Analysis"])
-                    
-                    # Step 2: Fetch data concurrently
-                    status_text.text("📊 Fetching market data...")
-                    progress_bar.progress(40)
-                    
-                    # Get market data
-                    market_data = data_fetcher.get_market_data(token_info['id'])
-                    price_data = data_fetcher.get_price(token_info['symbol'])
-                    
-                    with tab1:
-                        display_market_data(market_data, price_data)
-                    
-                    progress_bar.progress(60)
-                    status_text.text("📰 Fetching latest news...")
-                    
-                    # Get news
-                    news_data = data_fetcher.get_news(token_info['name'])
-                    
-                    with tab2:
-                        display_news(news_data)
-                    
-                    progress_bar.progress(80)
-                    status_text.text("🤖 Generating AI analysis...")
-                    
-                    # Step 3: Generate AI response
-                    analysis_prompt = response_generator.create_analysis_prompt(
-                        token_info=token_info,
-                        market_data=market_data,
-                        price_data=price_data,
-                        news_data=news_data,
-                        language=language.lower(),
-                        depth=analysis_depth.lower()
-                    )
-                    
-                    ai_response = response_generator.generate_response(
-                        analysis_prompt, 
-                        model=selected_model
-                    )
-                    
-                    progress_bar.progress(100)
-                    status_text.text("✅ Analysis complete!")
-                    
-                    with tab3:
-                        st.markdown("### 🤖 AI Analysis")
-                        st.markdown(ai_response)
-                        
-                        # Download option
-                        st.download_button(
-                            label="📥 Download Analysis",
-                            data=ai_response,
-                            file_name=f"{token_info['name']}_analysis_{int(time.time())}.txt",
-                            mime="text/plain"
+
+                # Step 2: Fetch data concurrently
+                status_text.text("📊 Fetching market data and news...")
+                progress_bar.progress(40)
+
+                # Price, market data and news are independent requests,
+                # so run them concurrently instead of back-to-back
+                price_data, market_data, news_data = fetch_token_data(token_info)
+
+                progress_bar.progress(60)
+                status_text.text("🤖 Generating AI analysis...")
+
+                # Step 3: Generate AI response
+                analysis_prompt = response_generator.create_analysis_prompt(
+                    token_info=token_info,
+                    market_data=market_data,
+                    price_data=price_data,
+                    news_data=news_data,
+                    language=language.lower(),
+                    depth=analysis_depth.lower()
+                )
+
+                # Stream tokens into a placeholder as the model emits
+                # them, so first text appears after one token instead
+                # of after the full completion; the placeholder is
+                # cleared once the tabs render the stored result
+                stream_area = st.empty()
+                with stream_area.container():
+                    st.markdown("### 🤖 AI Analysis")
+                    ai_response = st.write_stream(
+                        response_generator.generate_response_stream(
+                            analysis_prompt,
+                            model=selected_model,
+                            depth=analysis_depth.lower()
                         )
-                
-                # Clear progress indicators
+                    )
+                if not isinstance(ai_response, str):
+                    ai_response = "".join(ai_response)
+
+                progress_bar.progress(100)
+                status_text.text("✅ Analysis complete!")
+
+                # Persist results so sidebar-only reruns re-render the
+                # tabs without touching the fetchers or Ollama again
+                st.session_state.analysis = {
+                    'token_info': token_info,
+                    'market_data': market_data,
+                    'price_data': price_data,
+                    'news_data': news_data,
+                    'ai_response': ai_response
+                }
+
+                # Clear progress indicators and the streaming placeholder
                 time.sleep(1)
+                stream_area.empty()
                 progress_container.empty()
-                
+
             except Exception as e:
                 logger.error(f"Error during analysis: {e}")
                 st.error(f"❌ An error occurred: {str(e)}")
                 st.info("💡 Try refreshing the page or checking your internet connection")
-    
+
+    # Render the latest analysis (survives widget-driven reruns)
+    if 'analysis' in st.session_state:
+        display_analysis_results()
+
     # Footer
     st.markdown("---")
     st.markdown(
@@ -1,9 +1,32 @@
+import asyncio
+import functools
+import json
 import time
+import types
+import aiohttp
+import httpx
 import streamlit as st
 import logging
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any
 
+# Faster libuv-backed event loop for the async fetchers (Linux/macOS only)
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+
+from assistant.prompt_cache import get_prompt_cache
+
+# Optional: multi-pattern token matching in a single pass
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,19 +41,19 @@ class SimpleConfig:
 # Simple data fetcher with better error handling
 class SimpleDataFetcher:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'AI-Crypto-Assistant/2.0'})
-    
-    def get_price(self, symbol: str) -> Dict[str, Any]:
+        self.headers = {'User-Agent': 'AI-Crypto-Assistant/2.0'}
+        self.timeout = aiohttp.ClientTimeout(total=10)
+
+    async def get_price(self, session: aiohttp.ClientSession, symbol: str) -> Dict[str, Any]:
         """Get price from Binance API"""
         try:
             url = f"https://api.binance.com/api/v3/ticker/24hr"
             params = {"symbol": f"{symbol.upper()}USDT"}
-            
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
+
+            async with session.get(url, params=params) as response:
+                response.raise_for_status()
+                data = await response.json()
+
             return {
                 "price": float(data.get("lastPrice", 0)),
                 "change_24h": float(data.get("priceChangePercent", 0)),
@@ -43,8 +66,8 @@ class SimpleDataFetcher:
         except Exception as e:
             logger.warning(f"Binance API failed: {e}")
             return self._get_fallback_price_data()
-    
-    def get_market_data(self, coin_id: str) -> Dict[str, Any]:
+
+    async def get_market_data(self, session: aiohttp.ClientSession, coin_id: str) -> Dict[str, Any]:
         """Get market data from CoinGecko API"""
         try:
             url = f"https://api.coingecko.com/api/v3/simple/price"
@@ -55,11 +78,11 @@ class SimpleDataFetcher:
                 "include_24hr_change": "true",
                 "include_24hr_vol": "true"
             }
-            
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
+
+            async with session.get(url, params=params) as response:
+                response.raise_for_status()
+                data = await response.json()
+
             if coin_id.lower() in data:
                 coin_data = data[coin_id.lower()]
                 return {
@@ -72,10 +95,46 @@ class SimpleDataFetcher:
                 }
         except Exception as e:
             logger.warning(f"CoinGecko API failed: {e}")
-        
+
         return self._get_fallback_market_data()
-    
-    def get_news(self, coin_name: str) -> list:
+
+    async def _fetch_bundle(self, session: aiohttp.ClientSession, token_info: Dict[str, str]) -> tuple:
+        """Fetch price, market data and news for one token concurrently"""
+        results = await asyncio.gather(
+            self.get_price(session, token_info['symbol']),
+            self.get_market_data(session, token_info['id']),
+            self.get_news(token_info['name']),
+            return_exceptions=True
+        )
+
+        price_data, market_data, news_data = results
+        if isinstance(price_data, Exception):
+            price_data = self._get_fallback_price_data()
+        if isinstance(market_data, Exception):
+            market_data = self._get_fallback_market_data()
+        if isinstance(news_data, Exception):
+            news_data = []
+
+        return price_data, market_data, news_data
+
+    async def fetch_all(self, token_info: Dict[str, str]) -> tuple:
+        """Fetch price, market data and news concurrently over one session"""
+        async with aiohttp.ClientSession(headers=self.headers, timeout=self.timeout) as session:
+            return await self._fetch_bundle(session, token_info)
+
+    async def fetch_many(self, token_infos: list) -> list:
+        """Fetch bundles for several tokens at once over one session
+
+        Comparative queries ('BTC vs ETH') fan out all requests for all
+        tokens together, so N tokens cost one round of concurrent
+        requests instead of N sequential fetch rounds.
+        """
+        async with aiohttp.ClientSession(headers=self.headers, timeout=self.timeout) as session:
+            return list(await asyncio.gather(
+                *(self._fetch_bundle(session, token_info) for token_info in token_infos)
+            ))
+
+    async def get_news(self, coin_name: str) -> list:
         """Get news - with graceful fallback if API fails"""
         try:
             # For now, return a placeholder since CryptoPanic is having issues
@@ -121,8 +180,14 @@ class SimpleDataFetcher:
 # Simple response generator with better Ollama handling
 class SimpleResponseGenerator:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({'Content-Type': 'application/json'})
+        # HTTP/2 client with keep-alive so repeated Ollama calls reuse
+        # one multiplexed connection instead of re-handshaking
+        self.session = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20),
+            headers={'Content-Type': 'application/json'}
+        )
+        self.prompt_cache = get_prompt_cache(ttl=3600)
     
     def test_ollama_connection(self) -> bool:
         """Test if Ollama is accessible"""
@@ -134,6 +199,11 @@ class SimpleResponseGenerator:
     
     def generate_response(self, prompt: str, model: str = "llama2") -> str:
         """Generate response with better error handling"""
+        # Check the prompt cache before paying for an Ollama round-trip
+        cached_response = self.prompt_cache.get(model, prompt)
+        if cached_response is not None:
+            return cached_response
+
         # First test connection
         if not self.test_ollama_connection():
             return self._get_connection_error_response()
@@ -157,15 +227,65 @@ class SimpleResponseGenerator:
             
             generated_text = result.get("response", "")
             if generated_text:
+                self.prompt_cache.put(model, prompt, generated_text)
                 return generated_text
             else:
                 return self._get_empty_response_error()
                 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             return self._get_timeout_error_response()
         except Exception as e:
             logger.error(f"Ollama generation failed: {e}")
             return self._get_generation_error_response(str(e))
+
+    def generate_response_stream(self, prompt: str, model: str = "llama2"):
+        """Yield response tokens as they arrive instead of blocking on the
+        full completion, so the UI shows text after time-to-first-token"""
+        cached_response = self.prompt_cache.get(model, prompt)
+        if cached_response is not None:
+            yield cached_response
+            return
+
+        if not self.test_ollama_connection():
+            yield self._get_connection_error_response()
+            return
+
+        try:
+            url = "http://127.0.0.1:11434/api/generate"
+            data = {
+                "model": model,
+                "prompt": prompt,
+                "stream": True,
+                "options": {
+                    "temperature": 0.7,
+                    "num_predict": 300
+                }
+            }
+
+            chunks = []
+            with self.session.stream("POST", url, json=data, timeout=45) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    payload = json.loads(line)
+                    token = payload.get("response", "")
+                    if token:
+                        chunks.append(token)
+                        yield token
+                    if payload.get("done"):
+                        break
+
+            if chunks:
+                self.prompt_cache.put(model, prompt, "".join(chunks))
+            else:
+                yield self._get_empty_response_error()
+
+        except httpx.TimeoutException:
+            yield self._get_timeout_error_response()
+        except Exception as e:
+            logger.error(f"Ollama streaming failed: {e}")
+            yield self._get_generation_error_response(str(e))
     
     def _get_connection_error_response(self):
         return """
@@ -229,38 +349,74 @@ class SimpleResponseGenerator:
 **Рыночные данные выше остаются актуальными.**
         """.strip()
 
+@st.cache_data(ttl=300, show_spinner=False)  # Cache for 5 minutes
+def fetch_token_data(token_infos: list) -> list:
+    """Fetch data bundles for tokens, cached so repeat queries skip the network"""
+    _, data_fetcher, _ = initialize_components()
+    return asyncio.run(data_fetcher.fetch_many(token_infos))
+
+# Simple mapping for major cryptocurrencies. Read-only view so nothing
+# on the render path can mutate it and invalidate the caches below.
+TOKEN_MAP = types.MappingProxyType({
+    "bitcoin": {"name": "Bitcoin", "symbol": "BTC", "id": "bitcoin"},
+    "btc": {"name": "Bitcoin", "symbol": "BTC", "id": "bitcoin"},
+    "ethereum": {"name": "Ethereum", "symbol": "ETH", "id": "ethereum"},
+    "eth": {"name": "Ethereum", "symbol": "ETH", "id": "ethereum"},
+    "binance": {"name": "Binance Coin", "symbol": "BNB", "id": "binancecoin"},
+    "bnb": {"name": "Binance Coin", "symbol": "BNB", "id": "binancecoin"},
+    "cardano": {"name": "Cardano", "symbol": "ADA", "id": "cardano"},
+    "ada": {"name": "Cardano", "symbol": "ADA", "id": "cardano"},
+    "solana": {"name": "Solana", "symbol": "SOL", "id": "solana"},
+    "sol": {"name": "Solana", "symbol": "SOL", "id": "solana"},
+    "dogecoin": {"name": "Dogecoin", "symbol": "DOGE", "id": "dogecoin"},
+    "doge": {"name": "Dogecoin", "symbol": "DOGE", "id": "dogecoin"},
+    "polkadot": {"name": "Polkadot", "symbol": "DOT", "id": "polkadot"},
+    "dot": {"name": "Polkadot", "symbol": "DOT", "id": "polkadot"},
+    "chainlink": {"name": "Chainlink", "symbol": "LINK", "id": "chainlink"},
+    "link": {"name": "Chainlink", "symbol": "LINK", "id": "chainlink"},
+})
+
+# Longest keys first so "bitcoin" wins before "btc" in the substring scan
+_TOKEN_KEYS = sorted(TOKEN_MAP, key=len, reverse=True)
+
+@functools.lru_cache(maxsize=1)
+def _token_automaton():
+    """Build one Aho-Corasick automaton over the token map, lazily"""
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for token, info in TOKEN_MAP.items():
+        automaton.add_word(token, info)
+    automaton.make_automaton()
+    return automaton
+
 # Simple token extraction
-def extract_token_info(query: str) -> Optional[Dict[str, str]]:
-    """Simple token extraction"""
+@st.cache_data(ttl=3600)  # Pure lookup, cache aggressively
+def extract_all_tokens(query: str) -> list:
+    """Extract every distinct token mentioned in the query, in order"""
     query_lower = query.lower()
-    
-    # Simple mapping for major cryptocurrencies
-    token_map = {
-        "bitcoin": {"name": "Bitcoin", "symbol": "BTC", "id": "bitcoin"},
-        "btc": {"name": "Bitcoin", "symbol": "BTC", "id": "bitcoin"},
-        "ethereum": {"name": "Ethereum", "symbol": "ETH", "id": "ethereum"},
-        "eth": {"name": "Ethereum", "symbol": "ETH", "id": "ethereum"},
-        "binance": {"name": "Binance Coin", "symbol": "BNB", "id": "binancecoin"},
-        "bnb": {"name": "Binance Coin", "symbol": "BNB", "id": "binancecoin"},
-        "cardano": {"name": "Cardano", "symbol": "ADA", "id": "cardano"},
-        "ada": {"name": "Cardano", "symbol": "ADA", "id": "cardano"},
-        "solana": {"name": "Solana", "symbol": "SOL", "id": "solana"},
-        "sol": {"name": "Solana", "symbol": "SOL", "id": "solana"},
-        "dogecoin": {"name": "Dogecoin", "symbol": "DOGE", "id": "dogecoin"},
-        "doge": {"name": "Dogecoin", "symbol": "DOGE", "id": "dogecoin"},
-        "polkadot": {"name": "Polkadot", "symbol": "DOT", "id": "polkadot"},
-        "dot": {"name": "Polkadot", "symbol": "DOT", "id": "polkadot"},
-        "chainlink": {"name": "Chainlink", "symbol": "LINK", "id": "chainlink"},
-        "link": {"name": "Chainlink", "symbol": "LINK", "id": "chainlink"},
-    }
-    
-    # Check for direct matches
-    for token, info in token_map.items():
-        if token in query_lower:
-            return info
-    
+    found = []
+
+    automaton = _token_automaton()
+    if automaton is not None:
+        # One linear scan of the query matches every known token at once
+        for _, info in automaton.iter(query_lower):
+            if info not in found:
+                found.append(info)
+    else:
+        # Fallback: per-token substring scan, longest keys first
+        for token in _TOKEN_KEYS:
+            info = TOKEN_MAP[token]
+            if token in query_lower and info not in found:
+                found.append(info)
+
     # Fallback to Bitcoin if nothing found
-    return {"name": "Bitcoin", "symbol": "BTC", "id": "bitcoin"}
+    return found or [{"name": "Bitcoin", "symbol": "BTC", "id": "bitcoin"}]
+
+def extract_token_info(query: str) -> Optional[Dict[str, str]]:
+    """Simple token extraction (first token mentioned in the query)"""
+    return extract_all_tokens(query)[0]
 
 # Utility functions
 def format_currency(value):
@@ -274,6 +430,37 @@ def format_currency(value):
     else:
         return f"{value:.2f}"
 
+@st.cache_resource
+def initialize_components():
+    """Initialize and cache application components"""
+    return SimpleConfig(), SimpleDataFetcher(), SimpleResponseGenerator()
+
+@st.cache_data(ttl=30, show_spinner=False)
+def probe_services() -> Dict[str, bool]:
+    """Probe Ollama and the external APIs concurrently
+
+    The three probes are independent, so wall time is the slowest single
+    probe instead of their sum; results are cached briefly so repeated
+    sidebar renders don't re-probe.
+    """
+    targets = {
+        "ollama": "http://127.0.0.1:11434/api/tags",
+        "binance": "https://api.binance.com/api/v3/ping",
+        "coingecko": "https://api.coingecko.com/api/v3/ping",
+    }
+    session = requests.Session()
+
+    def probe(url: str) -> bool:
+        try:
+            return session.get(url, timeout=3).status_code == 200
+        except Exception:
+            return False
+
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        results = executor.map(probe, targets.values())
+
+    return dict(zip(targets.keys(), results))
+
 def main():
     st.set_page_config(
         page_title="🧠 AI Crypto Assistant (Debug Mode)",
@@ -284,43 +471,33 @@ def main():
     st.title("🧠 AI Crypto Assistant - Debug Mode")
     st.markdown("*Enhanced error handling and diagnostics*")
     
-    # Initialize components
-    config = SimpleConfig()
-    data_fetcher = SimpleDataFetcher()
-    response_generator = SimpleResponseGenerator()
+    # Initialize components (cached across Streamlit reruns)
+    config, data_fetcher, response_generator = initialize_components()
     
     # Sidebar with diagnostics
     with st.sidebar:
         st.header("🔧 System Status")
-        
-        # Test Ollama connection
-        ollama_status = response_generator.test_ollama_connection()
-        if ollama_status:
+
+        # All connectivity probes run concurrently and share a cache
+        service_status = probe_services()
+
+        if service_status["ollama"]:
             st.success("✅ Ollama: Connected")
         else:
             st.error("❌ Ollama: Disconnected")
             st.markdown("**Fix:** Run `ollama serve` in terminal")
-        
-        # Test APIs
+
         st.markdown("**API Status:**")
-        try:
-            test_response = requests.get("https://api.binance.com/api/v3/ping", timeout=5)
-            if test_response.status_code == 200:
-                st.success("✅ Binance API")
-            else:
-                st.warning("⚠️ Binance API")
-        except:
+        if service_status["binance"]:
+            st.success("✅ Binance API")
+        else:
             st.error("❌ Binance API")
-        
-        try:
-            test_response = requests.get("https://api.coingecko.com/api/v3/ping", timeout=5)
-            if test_response.status_code == 200:
-                st.success("✅ CoinGecko API")
-            else:
-                st.warning("⚠️ CoinGecko API")
-        except:
+
+        if service_status["coingecko"]:
+            st.success("✅ CoinGecko API")
+        else:
             st.error("❌ CoinGecko API")
-        
+
         st.error("❌ CryptoPanic API (Known issue)")
         
         st.markdown("---")
@@ -361,77 +538,69 @@ def main():
                     st.error("❌ Cannot connect to Ollama")
     
     if query and analyze_button:
-        with st.spinner("Analyzing..."):
-            # Extract token
-            token_info = extract_token_info(query)
-            st.success(f"🎯 Analyzing: **{token_info['name']} ({token_info['symbol']})**")
-            
-            # Create progress
-            progress_bar = st.progress(0)
-            
-            # Fetch data
-            progress_bar.progress(25)
-            st.write("📊 Fetching price data...")
-            price_data = data_fetcher.get_price(token_info['symbol'])
-            
-            progress_bar.progress(50)
-            st.write("📈 Fetching market data...")
-            market_data = data_fetcher.get_market_data(token_info['id'])
-            
-            progress_bar.progress(75)
-            st.write("📰 Fetching news...")
-            news_data = data_fetcher.get_news(token_info['name'])
-            
-            progress_bar.progress(100)
-            
-            # Display data
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                price = price_data.get('price', 0)
-                st.metric("Price (USD)", f"${price:.2f}" if price > 0 else "N/A")
-            
-            with col2:
-                change = price_data.get('change_24h', 0)
-                st.metric("24h Change", f"{change:.2f}%" if change != 0 else "N/A")
-            
-            with col3:
-                market_cap = market_data.get('market_cap', 0)
-                st.metric("Market Cap", f"${format_currency(market_cap)}" if market_cap > 0 else "N/A")
-            
-            with col4:
-                volume = price_data.get('volume', 0)
-                st.metric("24h Volume", f"{format_currency(volume)}" if volume > 0 else "N/A")
-            
-            # News section
-            st.subheader("📰 Latest News")
-            for article in news_data[:3]:
-                st.write(f"• **{article['title']}** _{article['source']}_")
-            
-            # AI Analysis
-            st.subheader("🤖 AI Analysis")
-            
-            # Create prompt
-            prompt = f"""
-Проанализируй криптовалюту {token_info['name']} ({token_info['symbol']}) на основе данных:
+        # Extract every token mentioned (comparative queries like
+        # "BTC vs ETH" produce several)
+        tokens = extract_all_tokens(query)
+        token_labels = ", ".join(f"{t['name']} ({t['symbol']})" for t in tokens)
+        st.success(f"🎯 Analyzing: **{token_labels}**")
 
-Цена: ${price_data.get('price', 'N/A')}
-Изменение за 24ч: {price_data.get('change_24h', 'N/A')}%
-Рыночная капитализация: ${market_data.get('market_cap', 'N/A')}
+        # One st.status block instead of per-step st.write calls: each
+        # st.write pushes a separate delta to the browser
+        with st.status("📊 Fetching price, market and news data...") as status:
+            fetch_start = time.time()
+            bundles = fetch_token_data(tokens)
+            logger.info(f"Data fetch completed in {time.time() - fetch_start:.2f}s")
+            status.update(label="✅ Data fetched", state="complete")
 
-Дай краткий анализ (2-3 абзаца) на русском языке. Включи:
+        token_tabs = st.tabs([t['symbol'] for t in tokens])
+        for tab, token_info, bundle in zip(token_tabs, tokens, bundles):
+            price_data, market_data, news_data = bundle
+
+            with tab:
+                # Display data
+                col1, col2, col3, col4 = st.columns(4)
+
+                with col1:
+                    price = price_data.get('price', 0)
+                    st.metric("Price (USD)", f"${price:.2f}" if price > 0 else "N/A")
+
+                with col2:
+                    change = price_data.get('change_24h', 0)
+                    st.metric("24h Change", f"{change:.2f}%" if change != 0 else "N/A")
+
+                with col3:
+                    market_cap = market_data.get('market_cap', 0)
+                    st.metric("Market Cap", f"${format_currency(market_cap)}" if market_cap > 0 else "N/A")
+
+                with col4:
+                    volume = price_data.get('volume', 0)
+                    st.metric("24h Volume", f"{format_currency(volume)}" if volume > 0 else "N/A")
+
+                # News section
+                st.subheader("📰 Latest News")
+                for article in news_data[:3]:
+                    st.write(f"• **{article['title']}** _{article['source']}_")
+
+                # AI Analysis
+                st.subheader("🤖 AI Analysis")
+
+                # Create prompt (static instructions first so Ollama can
+                # reuse the prefix KV cache across queries)
+                prompt = f"""
+Дай краткий анализ криптовалюты (2-3 абзаца) на русском языке. Включи:
 1. Текущее состояние
 2. Краткий прогноз
 3. Основные факторы влияния
 
 Будь объективным и не давай финансовых советов.
-            """
-            
-            ai_response = response_generator.generate_response(prompt)
-            st.markdown(ai_response)
-            
-            # Clear progress
-            progress_bar.empty()
+
+Криптовалюта: {token_info['name']} ({token_info['symbol']})
+Цена: ${price_data.get('price', 'N/A')}
+Изменение за 24ч: {price_data.get('change_24h', 'N/A')}%
+Рыночная капитализация: ${market_data.get('market_cap', 'N/A')}
+                """
+
+                ai_response = st.write_stream(response_generator.generate_response_stream(prompt))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
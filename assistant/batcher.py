@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+BATCH_WINDOW = 0.05   # Seconds to wait for more prompts to coalesce
+MAX_BATCH_SIZE = 8    # Flush early once this many prompts are queued
+MAX_PARALLEL = 4      # Concurrent /api/generate calls against Ollama
+
+@dataclass
+class _PendingRequest:
+    """A queued prompt waiting for its completion"""
+    payload: Dict[str, Any]
+    future: asyncio.Future
+
+class PromptBatcher:
+    """Coalesce concurrent generation calls into bounded parallel batches
+
+    Under multi-user deployment each session hits /api/generate on its
+    own and Ollama serializes them. Prompts arriving within the batch
+    window are flushed together; Ollama has no native batch endpoint,
+    so a flush issues the requests in parallel over one connection pool,
+    bounded by a semaphore.
+    """
+
+    def __init__(self, base_url: str = "http://127.0.0.1:11434", timeout: int = 60):
+        self.base_url = base_url
+        self.timeout = timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, prompt: str, model: str = "llama2", options: Dict = None) -> str:
+        """Queue a prompt and wait for its completion text"""
+        self._ensure_started()
+
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": "10m"  # Hold model + KV cache between calls
+        }
+        if options:
+            payload["options"] = options
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingRequest(payload, future))
+        return await future
+
+    def _ensure_started(self):
+        """Lazily create the queue, session and worker on the running loop"""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._semaphore = asyncio.Semaphore(MAX_PARALLEL)
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Content-Type': 'application/json'}
+            )
+            self._worker = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        """Collect prompts for up to BATCH_WINDOW, then dispatch together"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + BATCH_WINDOW
+
+            while len(batch) < MAX_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            if len(batch) > 1:
+                logger.info(f"Dispatching batch of {len(batch)} prompts")
+            await asyncio.gather(*(self._dispatch(request) for request in batch))
+
+    async def _dispatch(self, request: _PendingRequest):
+        """Send one request, bounded by the parallelism semaphore"""
+        try:
+            async with self._semaphore:
+                async with self._session.post(
+                    f"{self.base_url}/api/generate",
+                    json=request.payload
+                ) as response:
+                    response.raise_for_status()
+                    result = await response.json()
+
+            request.future.set_result(result.get("response", "").strip())
+        except Exception as e:
+            if not request.future.done():
+                request.future.set_exception(e)
+
+# Singleton batcher on a dedicated loop thread so synchronous Streamlit
+# call sites across sessions share one coalescing queue per process
+_batcher: Optional[PromptBatcher] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _batcher, _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_loop.run_forever, name="ollama-batcher", daemon=True)
+            thread.start()
+            _batcher = PromptBatcher()
+    return _loop
+
+def submit_sync(prompt: str, model: str = "llama2", options: Dict = None, timeout: int = 90) -> str:
+    """Submit a prompt from synchronous code and block for the result"""
+    loop = _get_loop()
+    future = asyncio.run_coroutine_threadsafe(_batcher.submit(prompt, model, options), loop)
+    return future.result(timeout=timeout)
@@ -1,3 +1,4 @@
+import functools
 import os
 from dataclasses import dataclass
 from typing import Optional
@@ -56,19 +57,26 @@ class Config:
         self._validate_config()
     
     def _validate_config(self):
-        """Validate configuration settings"""
+        """Validate configuration settings
+
+        Deliberately offline: probing Ollama here would block every
+        Config() construction (and thus every cold Streamlit rerun) for
+        up to 5 seconds. Use ping_ollama() for an explicit health check.
+        """
         if not self.api_keys.CRYPTOPANIC:
             print("⚠️ Warning: CRYPTOPANIC_API_KEY not found. News fetching may be limited.")
-        
-        # Check if Ollama is accessible
+
+    @functools.lru_cache(maxsize=1)
+    def ping_ollama(self) -> bool:
+        """Check whether the Ollama server is reachable (cached per process)"""
         try:
             import requests
             response = requests.get(f"{self.endpoints.OLLAMA_BASE}/api/tags", timeout=5)
-            if response.status_code != 200:
-                print("⚠️ Warning: Ollama server may not be running.")
+            return response.status_code == 200
         except Exception:
-            print("⚠️ Warning: Cannot connect to Ollama server.")
-    
+            return False
+
+
     def get_ollama_url(self, endpoint: str = "") -> str:
         """Get full Ollama URL"""
         return f"{self.endpoints.OLLAMA_BASE}/{endpoint}".rstrip("/")
@@ -1,133 +1,365 @@
+import asyncio
+import aiohttp
+import itertools
+import operator
+import random
 import requests
+import threading
 import time
 import logging
+from dataclasses import dataclass
 from typing import Dict, List, Any, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from functools import lru_cache
-import streamlit as st
+from functools import lru_cache, wraps
+from urllib3.util.retry import Retry
+
+from assistant.utils import format_currency
+
+# Optional: incremental JSON parsing for large news payloads
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Faster JSON decoding for the nested CoinGecko payloads; decodes
+# straight from bytes so there's no intermediate str either
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
+# News projection: defaults merged per item in one C-level dict union,
+# fields pulled with one itemgetter call instead of .get per key
+_NEWS_DEFAULTS = {
+    "title": "No title",
+    "published_at": "Unknown",
+    "url": "#",
+    "kind": "news",
+}
+_NEWS_FIELDS = operator.itemgetter("title", "published_at", "url", "kind")
+_EMPTY: Dict = {}
+
+_session = None
+_session_lock = threading.Lock()
+
+def _get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it once
+
+    Streamlit runs scripts concurrently and get_comprehensive_data fans
+    out over threads; with per-instance sessions and default pool sizes
+    the adapter silently opens non-pooled connections once saturated,
+    losing keep-alive. One explicitly sized shared pool lets every
+    concurrent fetch reuse sockets.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # urllib3 retries with exponential backoff at transport
+            # level: honors Retry-After on CryptoPanic 429s and keeps
+            # the retry loop out of Python
+            retries = Retry(
+                total=3,
+                backoff_factor=1,
+                status_forcelist=[429, 500, 502, 503, 504],
+                respect_retry_after_header=True,
+                allowed_methods=["GET"]
+            )
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=32,
+                pool_maxsize=32,
+                max_retries=retries,
+                pool_block=False
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update({
+                'User-Agent': 'AI-Crypto-Assistant/2.0',
+                'Connection': 'keep-alive'
+            })
+            _session = session
+    return _session
+
+def _stale_while_revalidate(ttl: int, grace: int, jitter: float = 0.0):
+    """Cache decorator that serves stale entries while refreshing
+
+    st.cache_data blocks the first caller after expiry for the full
+    network round-trip. Here an entry older than `ttl` but inside the
+    grace window is returned immediately while a daemon thread fetches
+    the replacement, so reads never stall on a TTL boundary; only
+    entries past ttl+grace block. Keyed on the call arguments, with
+    self excluded the same way the _self convention excludes it from
+    st.cache_data hashing.
+
+    `jitter` spreads each entry's effective TTL over ttl*(1±jitter) so
+    entries written together don't all expire in the same instant and
+    re-fetch as a burst.
+    """
+    def decorator(func):
+        entries: Dict[tuple, tuple] = {}
+        refreshing = set()
+        lock = threading.Lock()
+
+        def _effective_ttl() -> float:
+            return ttl * random.uniform(1 - jitter, 1 + jitter) if jitter else ttl
+
+        def _refresh(self, key, args, kwargs):
+            try:
+                value = func(self, *args, **kwargs)
+                with lock:
+                    entries[key] = (value, time.time(), _effective_ttl())
+            except Exception as e:
+                logger.warning(f"Background refresh of {func.__name__}{key} failed: {e}")
+            finally:
+                with lock:
+                    refreshing.discard(key)
+
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            with lock:
+                entry = entries.get(key)
+
+            if entry is not None:
+                value, fetched_at, entry_ttl = entry
+                age = time.time() - fetched_at
+                if age < entry_ttl:
+                    return value
+                if age < entry_ttl + grace:
+                    # Serve stale, refresh in the background (once)
+                    with lock:
+                        spawn = key not in refreshing
+                        if spawn:
+                            refreshing.add(key)
+                    if spawn:
+                        threading.Thread(
+                            target=_refresh, args=(self, key, args, kwargs), daemon=True
+                        ).start()
+                    return value
+
+            value = func(self, *args, **kwargs)
+            with lock:
+                entries[key] = (value, time.time(), _effective_ttl())
+            return value
+
+        return wrapper
+    return decorator
+
+@dataclass(slots=True)
+class PriceSnapshot:
+    """Validated price data from one source
+
+    Attribute access replaces the dict.get(..., 0) defaulting that was
+    repeated at every consumer, and slots keep the per-render objects
+    cheap.
+    """
+    price: float = 0.0
+    change_24h: float = 0.0
+    volume_24h: float = 0.0
+    high_24h: float = 0.0
+    low_24h: float = 0.0
+    source: str = "Error"
+
+    def __format__(self, spec: str) -> str:
+        if spec == "cur":
+            return format_currency(self.price)
+        return str(self)
+
+@dataclass(slots=True, frozen=True)
+class NewsItem:
+    """One news article in the shape the UI renders"""
+    title: str = "No title"
+    published_at: str = "Unknown"
+    url: str = "#"
+    source: str = "Unknown"
+    kind: str = "news"
+    votes_positive: int = 0
+    votes_negative: int = 0
+
+@dataclass(slots=True)
+class MarketSnapshot:
+    """Validated market data from CoinGecko"""
+    market_cap: float = 0.0
+    rank: int = 0
+    total_volume: float = 0.0
+    circulating_supply: float = 0.0
+    total_supply: float = 0.0
+    max_supply: float = 0.0
+    price_change_24h: float = 0.0
+    price_change_7d: float = 0.0
+    price_change_30d: float = 0.0
+    ath: float = 0.0
+    atl: float = 0.0
+    last_updated: str = "Unknown"
+
+    def __format__(self, spec: str) -> str:
+        if spec == "cur":
+            return format_currency(self.market_cap)
+        return str(self)
+
 class DataFetcher:
     """Enhanced data fetcher with improved CryptoPanic API handling"""
-    
+
+    _NEWS_URL = "https://cryptopanic.com/api/v1/posts/"
+
+    # Per-method knobs; the actual params dict is built lazily for the
+    # method being attempted, so the common path (first method works)
+    # allocates one dict instead of four
+    _NEWS_METHODS = (
+        # Method 1: Standard posts endpoint
+        {"public": True, "currencies": "name"},
+        # Method 2: Without filter parameter
+        {"public": False, "currencies": "name"},
+        # Method 3: Different currency format
+        {"public": True, "currencies": "code"},
+        # Method 4: General crypto news (fallback)
+        {"public": True, "currencies": None},
+    )
+
     def __init__(self, config):
         self.config = config
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'AI-Crypto-Assistant/2.0'
-        })
+        self.session = _get_session()
+        # Per-coin memory of which CryptoPanic method worked last, and
+        # a short cool-off after a full sweep of failures
+        self._last_good_method: Dict[str, int] = {}
+        self._news_dead_until: Dict[str, float] = {}
     
-    def _make_request(self, url: str, params: Dict = None, max_retries: int = None) -> Optional[Dict]:
-        """Make HTTP request with retry logic"""
-        max_retries = max_retries or self.config.MAX_RETRIES
-        
-        for attempt in range(max_retries):
-            try:
-                response = self.session.get(
-                    url, 
-                    params=params, 
-                    timeout=self.config.REQUEST_TIMEOUT
-                )
-                response.raise_for_status()
-                return response.json()
-                
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"Request attempt {attempt + 1} failed: {e}")
-                if attempt == max_retries - 1:
-                    logger.error(f"All {max_retries} attempts failed for {url}")
-                    return None
-                time.sleep(self.config.RETRY_DELAY * (attempt + 1))
-        
-        return None
+    def _make_request(self, url: str, params: Dict = None) -> Optional[Dict]:
+        """Make HTTP request; retries happen in the transport adapter"""
+        try:
+            response = self.session.get(
+                url,
+                params=params,
+                timeout=self.config.REQUEST_TIMEOUT
+            )
+            response.raise_for_status()
+            return _json_loads(response.content)
+
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request failed for {url}: {e}")
+            return None
     
-    @st.cache_data(ttl=300)  # Cache for 5 minutes
-    def get_news(_self, coin_name: str, limit: int = 10) -> List[Dict[str, Any]]:
+    @_stale_while_revalidate(ttl=300, grace=300, jitter=0.2)
+    def get_news(self, coin_name: str, limit: int = 10) -> List[NewsItem]:
         """Fetch cryptocurrency news from CryptoPanic with improved error handling"""
-        if not _self.config.api_keys.CRYPTOPANIC:
-            return _self._get_no_api_key_news(coin_name)
-        
-        # Try multiple CryptoPanic endpoints and parameters
-        endpoints_to_try = [
-            # Method 1: Standard posts endpoint
-            {
-                "url": "https://cryptopanic.com/api/v1/posts/",
-                "params": {
-                    "auth_token": _self.config.api_keys.CRYPTOPANIC,
-                    "currencies": coin_name.lower(),
-                    "public": "true"
-                }
-            },
-            # Method 2: Without filter parameter
-            {
-                "url": "https://cryptopanic.com/api/v1/posts/",
-                "params": {
-                    "auth_token": _self.config.api_keys.CRYPTOPANIC,
-                    "currencies": coin_name.lower()
-                }
-            },
-            # Method 3: Different currency format
-            {
-                "url": "https://cryptopanic.com/api/v1/posts/",
-                "params": {
-                    "auth_token": _self.config.api_keys.CRYPTOPANIC,
-                    "currencies": _self._get_currency_code(coin_name),
-                    "public": "true"
-                }
-            },
-            # Method 4: General crypto news (fallback)
-            {
-                "url": "https://cryptopanic.com/api/v1/posts/",
-                "params": {
-                    "auth_token": _self.config.api_keys.CRYPTOPANIC,
-                    "public": "true"
-                }
-            }
-        ]
-        
-        for i, endpoint_config in enumerate(endpoints_to_try):
+        if not self.config.api_keys.CRYPTOPANIC:
+            return self._get_no_api_key_news(coin_name)
+
+        coin_key = coin_name.lower()
+
+        # Recent full sweep of failures: don't hammer a dead endpoint
+        if time.time() < self._news_dead_until.get(coin_key, 0):
+            return self._get_fallback_news(coin_name)
+
+        # Start from whichever method worked last for this coin so the
+        # steady state is one request, not a walk through the variants
+        start = self._last_good_method.get(coin_key, 0)
+        order = list(range(len(self._NEWS_METHODS)))
+        order = order[start:] + order[:start]
+
+        for i in order:
             try:
                 logger.info(f"Trying CryptoPanic method {i+1}/4")
-                data = _self._make_request(endpoint_config["url"], endpoint_config["params"])
-                
-                if data and "results" in data:
-                    results = data.get("results", [])
-                    if results:  # If we got results, process them
-                        news_items = []
-                        for item in results[:limit]:
-                            # Filter for relevant news if we're using general endpoint
-                            title = item.get("title", "").lower()
-                            if i == 3:  # General news endpoint
-                                if coin_name.lower() not in title and _self._get_currency_code(coin_name).lower() not in title:
-                                    continue
-                            
-                            news_items.append({
-                                "title": item.get("title", "No title"),
-                                "published_at": item.get("published_at", "Unknown"),
-                                "url": item.get("url", "#"),
-                                "source": item.get("source", {}).get("title", "Unknown") if isinstance(item.get("source"), dict) else str(item.get("source", "Unknown")),
-                                "kind": item.get("kind", "news"),
-                                "votes": {
-                                    "positive": item.get("votes", {}).get("positive", 0),
-                                    "negative": item.get("votes", {}).get("negative", 0)
-                                }
-                            })
-                        
-                        if news_items:
-                            logger.info(f"Successfully fetched {len(news_items)} news items using method {i+1}")
-                            return news_items
-                        elif i < 3:  # Continue trying if no relevant news found
-                            continue
-                    elif i < 3:  # Continue trying if no results
-                        continue
-                        
+                params = self._build_news_params(self._NEWS_METHODS[i], coin_name)
+                # The general feed (method 4) is filtered by title, so
+                # stream extra raw items to have enough after filtering
+                scan_limit = limit if i < 3 else limit * 5
+                results = self._fetch_news_results(self._NEWS_URL, params, scan_limit)
+
+                if results:  # If we got results, process them
+                    news_items = self._extract_news_items(results, coin_name, limit, filter_general=(i == 3))
+
+                    if news_items:
+                        logger.info(f"Successfully fetched {len(news_items)} news items using method {i+1}")
+                        self._last_good_method[coin_key] = i
+                        return news_items
+
             except Exception as e:
                 logger.warning(f"CryptoPanic method {i+1} failed: {e}")
                 continue
-        
-        # If all methods fail, return informative fallback
-        return _self._get_fallback_news(coin_name)
-    
+
+        # If all methods fail, back off for a minute and return fallback
+        self._news_dead_until[coin_key] = time.time() + 60
+        return self._get_fallback_news(coin_name)
+
+    def _fetch_news_results(self, url: str, params: Dict, limit: int) -> Optional[List[Dict]]:
+        """Fetch the CryptoPanic results array, parsing incrementally
+
+        Only the first `limit` articles are ever used, so with ijson the
+        stream is abandoned as soon as they are decoded instead of
+        buffering and parsing the whole payload.
+        """
+        if ijson is None:
+            data = self._make_request(url, params)
+            if data and "results" in data:
+                return data.get("results", [])[:limit]
+            return None
+
+        try:
+            with self.session.get(
+                url,
+                params=params,
+                timeout=self.config.REQUEST_TIMEOUT,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                return list(itertools.islice(ijson.items(response.raw, "results.item"), limit))
+
+        except Exception as e:
+            logger.error(f"Request failed for {url}: {e}")
+            return None
+
+    def _build_news_params(self, method: Dict[str, Any], coin_name: str) -> Dict[str, str]:
+        """Build the request params for one CryptoPanic method"""
+        params = {"auth_token": self.config.api_keys.CRYPTOPANIC}
+
+        if method["currencies"] == "name":
+            params["currencies"] = coin_name.lower()
+        elif method["currencies"] == "code":
+            params["currencies"] = self._get_currency_code(coin_name)
+
+        if method["public"]:
+            params["public"] = "true"
+
+        return params
+
+    def _extract_news_items(self, results: List[Dict], coin_name: str, limit: int, filter_general: bool = False) -> List[NewsItem]:
+        """Project raw CryptoPanic results into the news item shape used by the UI"""
+        # Normalize the needles once rather than per article
+        coin_lower = coin_name.lower()
+        code_lower = self._get_currency_code(coin_name).lower()
+
+        news_items = []
+        for item in results:
+            if len(news_items) == limit:
+                break
+
+            title, published_at, url, kind = _NEWS_FIELDS(_NEWS_DEFAULTS | item)
+
+            # Filter for relevant news if we're using the general endpoint
+            if filter_general:
+                title_lower = title.lower()
+                if coin_lower not in title_lower and code_lower not in title_lower:
+                    continue
+
+            source = item.get("source") or _EMPTY
+            votes = item.get("votes") or _EMPTY
+            news_items.append(NewsItem(
+                title=title,
+                published_at=published_at,
+                url=url,
+                source=source.get("title", "Unknown") if isinstance(source, dict) else str(source),
+                kind=kind,
+                votes_positive=votes.get("positive", 0),
+                votes_negative=votes.get("negative", 0)
+            ))
+
+        return news_items
+
     def _get_currency_code(self, coin_name: str) -> str:
         """Convert coin name to currency code"""
         currency_map = {
@@ -145,172 +377,410 @@ class DataFetcher:
         }
         return currency_map.get(coin_name.lower(), coin_name.upper())
     
-    def _get_no_api_key_news(self, coin_name: str) -> List[Dict[str, Any]]:
+    def _get_no_api_key_news(self, coin_name: str) -> List[NewsItem]:
         """Return helpful message when no API key is configured"""
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
         return [
-            {
-                "title": f"CryptoPanic API key not configured for {coin_name} news",
-                "published_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "url": "https://cryptopanic.com/developers/api/",
-                "source": "Configuration Notice",
-                "kind": "notice"
-            },
-            {
-                "title": "Get a free API key at cryptopanic.com to enable news features",
-                "published_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "url": "https://cryptopanic.com/developers/api/",
-                "source": "Setup Guide",
-                "kind": "info"
-            }
+            NewsItem(
+                title=f"CryptoPanic API key not configured for {coin_name} news",
+                published_at=now,
+                url="https://cryptopanic.com/developers/api/",
+                source="Configuration Notice",
+                kind="notice"
+            ),
+            NewsItem(
+                title="Get a free API key at cryptopanic.com to enable news features",
+                published_at=now,
+                url="https://cryptopanic.com/developers/api/",
+                source="Setup Guide",
+                kind="info"
+            )
         ]
-    
-    def _get_fallback_news(self, coin_name: str) -> List[Dict[str, Any]]:
+
+    def _get_fallback_news(self, coin_name: str) -> List[NewsItem]:
         """Return informative fallback when API fails"""
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
         return [
-            {
-                "title": f"CryptoPanic API is temporarily unavailable for {coin_name} news",
-                "published_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "url": "#",
-                "source": "System Notice",
-                "kind": "notice"
-            },
-            {
-                "title": f"Price and market data for {coin_name} are still available from other sources",
-                "published_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "url": "#",
-                "source": "System Info",
-                "kind": "info"
-            },
-            {
-                "title": "News will automatically resume when CryptoPanic API is restored",
-                "published_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "url": "#",
-                "source": "Auto-Recovery",
-                "kind": "info"
-            }
+            NewsItem(
+                title=f"CryptoPanic API is temporarily unavailable for {coin_name} news",
+                published_at=now,
+                source="System Notice",
+                kind="notice"
+            ),
+            NewsItem(
+                title=f"Price and market data for {coin_name} are still available from other sources",
+                published_at=now,
+                source="System Info",
+                kind="info"
+            ),
+            NewsItem(
+                title="News will automatically resume when CryptoPanic API is restored",
+                published_at=now,
+                source="Auto-Recovery",
+                kind="info"
+            )
         ]
     
-    @st.cache_data(ttl=30)  # Cache for 30 seconds (price changes frequently)
-    def get_price(_self, token_symbol: str) -> Dict[str, Any]:
+    @_stale_while_revalidate(ttl=30, grace=30, jitter=0.2)  # Price changes frequently
+    def get_price(self, token_symbol: str) -> PriceSnapshot:
         """Fetch current price from Binance"""
+        symbol_lower = token_symbol.lower()
         try:
             # Try Binance first
-            url = _self.config.get_binance_url("ticker/24hr")
+            url = self.config.get_binance_url("ticker/24hr")
             params = {"symbol": f"{token_symbol.upper()}USDT"}
-            
-            data = _self._make_request(url, params)
+
+            data = self._make_request(url, params)
             if data:
-                return {
-                    "price": float(data.get("lastPrice", 0)),
-                    "change_24h": float(data.get("priceChangePercent", 0)),
-                    "volume_24h": float(data.get("volume", 0)),
-                    "high_24h": float(data.get("highPrice", 0)),
-                    "low_24h": float(data.get("lowPrice", 0)),
-                    "source": "Binance"
-                }
+                return self._parse_binance_price(data)
         except Exception as e:
             logger.warning(f"Binance price fetch failed: {e}")
-        
+
         # Fallback to CoinGecko
         try:
-            url = _self.config.get_coingecko_url(f"simple/price")
+            url = self.config.get_coingecko_url(f"simple/price")
             params = {
-                "ids": token_symbol.lower(),
+                "ids": symbol_lower,
                 "vs_currencies": "usd",
                 "include_24hr_change": "true",
                 "include_24hr_vol": "true"
             }
-            
-            data = _self._make_request(url, params)
-            if data and token_symbol.lower() in data:
-                coin_data = data[token_symbol.lower()]
-                return {
-                    "price": coin_data.get("usd", 0),
-                    "change_24h": coin_data.get("usd_24h_change", 0),
-                    "volume_24h": coin_data.get("usd_24h_vol", 0),
-                    "source": "CoinGecko"
-                }
+
+            data = self._make_request(url, params)
+            if data and symbol_lower in data:
+                return self._parse_coingecko_price(data[symbol_lower])
         except Exception as e:
             logger.warning(f"CoinGecko price fetch failed: {e}")
-        
+
+        return self._get_fallback_price_data()
+
+    def get_prices_batch(self, symbols: List[str]) -> Dict[str, PriceSnapshot]:
+        """Fetch 24h tickers for several symbols in one Binance call
+
+        /ticker/24hr accepts a JSON array of symbols, so a dashboard
+        tracking N coins pays one round-trip instead of N.
+        """
+        if not symbols:
+            return {}
+
+        pairs = [f"{symbol.upper()}USDT" for symbol in symbols]
+        url = self.config.get_binance_url("ticker/24hr")
+        # Binance expects a JSON array literal without spaces
+        params = {"symbols": "[" + ",".join(f'"{pair}"' for pair in pairs) + "]"}
+
+        data = self._make_request(url, params)
+        by_pair = {item.get("symbol"): item for item in data} if data else {}
+
+        snapshots = {}
+        for symbol, pair in zip(symbols, pairs):
+            item = by_pair.get(pair)
+            snapshots[symbol.upper()] = (
+                self._parse_binance_price(item) if item else self._get_fallback_price_data()
+            )
+        return snapshots
+
+    def _parse_binance_price(self, data: Dict) -> PriceSnapshot:
+        """Parse a Binance 24hr ticker payload into a price snapshot"""
+        return PriceSnapshot(
+            price=float(data.get("lastPrice", 0)),
+            change_24h=float(data.get("priceChangePercent", 0)),
+            volume_24h=float(data.get("volume", 0)),
+            high_24h=float(data.get("highPrice", 0)),
+            low_24h=float(data.get("lowPrice", 0)),
+            source="Binance"
+        )
+
+    def _parse_coingecko_price(self, coin_data: Dict) -> PriceSnapshot:
+        """Parse a CoinGecko simple/price payload into a price snapshot"""
+        return PriceSnapshot(
+            price=coin_data.get("usd", 0) or 0.0,
+            change_24h=coin_data.get("usd_24h_change", 0) or 0.0,
+            volume_24h=coin_data.get("usd_24h_vol", 0) or 0.0,
+            source="CoinGecko"
+        )
+
+    def _get_fallback_price_data(self) -> PriceSnapshot:
+        """Return fallback price data when all sources fail"""
+        return PriceSnapshot()
+    
+    @_stale_while_revalidate(ttl=120, grace=120, jitter=0.2)
+    def _get_fast_market(self, token_id: str) -> Optional[Dict]:
+        """Fetch fast-moving market fields from simple/price
+
+        CoinGecko refreshes market_cap/volume/price-change roughly once
+        a minute, so these come from the tiny simple/price payload on a
+        short TTL rather than a second coins/{id} round-trip. The
+        response is reshaped to the coins/{id} layout so the merge in
+        get_market_data stays uniform.
+        """
+        url = self.config.get_coingecko_url("simple/price")
+        params = {
+            "ids": token_id,
+            "vs_currencies": "usd",
+            "include_market_cap": "true",
+            "include_24hr_vol": "true",
+            "include_24hr_change": "true"
+        }
+        data = self._make_request(url, params)
+        if not data or token_id not in data:
+            return None
+
+        coin = data[token_id]
         return {
-            "price": 0,
-            "change_24h": 0,
-            "volume_24h": 0,
-            "source": "Error"
+            "market_data": {
+                "market_cap": {"usd": coin.get("usd_market_cap", 0) or 0.0},
+                "total_volume": {"usd": coin.get("usd_24h_vol", 0) or 0.0},
+                "price_change_percentage_24h": coin.get("usd_24h_change", 0) or 0.0
+            }
         }
-    
-    @st.cache_data(ttl=300)  # Cache for 5 minutes
-    def get_market_data(_self, token_id: str) -> Dict[str, Any]:
-        """Fetch comprehensive market data from CoinGecko"""
-        url = _self.config.get_coingecko_url(f"coins/{token_id.lower()}")
+
+    @_stale_while_revalidate(ttl=3600, grace=600, jitter=0.2)
+    def _get_slow_market(self, token_id: str) -> Optional[Dict]:
+        """Fetch the coins/{id} payload for slow-moving fields
+
+        Supply, rank and ATH/ATL barely change intra-day, so the only
+        coins/{id} call runs on an hour TTL while the fast fields above
+        refresh from simple/price.
+        """
+        url = self.config.get_coingecko_url(f"coins/{token_id}")
         params = {
             "localization": "false",
             "tickers": "false",
             "market_data": "true",
-            "community_data": "true",
+            "community_data": "false",
             "developer_data": "false",
             "sparkline": "false"
         }
-        
-        data = _self._make_request(url, params)
-        if not data:
-            return _self._get_fallback_market_data()
-        
+        return self._make_request(url, params)
+
+    def get_market_data(self, token_id: str) -> MarketSnapshot:
+        """Fetch comprehensive market data from CoinGecko
+
+        Merges a short-TTL fetch for fast-moving fields with a long-TTL
+        fetch for slow ones; fast fields win where both payloads carry
+        them.
+        """
+        token_id = token_id.lower()
+        fast = self._get_fast_market(token_id)
+        slow = self._get_slow_market(token_id)
+        if not fast and not slow:
+            return self._get_fallback_market_data()
+
+        data = dict(slow or {})
+        data["market_data"] = {
+            **(slow or {}).get("market_data", {}),
+            **(fast or {}).get("market_data", {})
+        }
+        return self._parse_market_data(data)
+
+    def _parse_market_data(self, data: Dict) -> MarketSnapshot:
+        """Parse a CoinGecko coins/{id} payload into a market snapshot"""
         try:
             market_data = data.get("market_data", {})
-            return {
-                "market_cap": market_data.get("market_cap", {}).get("usd", 0),
-                "rank": data.get("market_cap_rank", 0),
-                "total_volume": market_data.get("total_volume", {}).get("usd", 0),
-                "circulating_supply": market_data.get("circulating_supply", 0),
-                "total_supply": market_data.get("total_supply", 0),
-                "max_supply": market_data.get("max_supply", 0),
-                "price_change_24h": market_data.get("price_change_percentage_24h", 0),
-                "price_change_7d": market_data.get("price_change_percentage_7d", 0),
-                "price_change_30d": market_data.get("price_change_percentage_30d", 0),
-                "ath": market_data.get("ath", {}).get("usd", 0),
-                "atl": market_data.get("atl", {}).get("usd", 0),
-                "last_updated": market_data.get("last_updated", "Unknown")
-            }
+            return MarketSnapshot(
+                market_cap=market_data.get("market_cap", {}).get("usd", 0) or 0.0,
+                rank=data.get("market_cap_rank", 0) or 0,
+                total_volume=market_data.get("total_volume", {}).get("usd", 0) or 0.0,
+                circulating_supply=market_data.get("circulating_supply", 0) or 0.0,
+                total_supply=market_data.get("total_supply", 0) or 0.0,
+                max_supply=market_data.get("max_supply", 0) or 0.0,
+                price_change_24h=market_data.get("price_change_percentage_24h", 0) or 0.0,
+                price_change_7d=market_data.get("price_change_percentage_7d", 0) or 0.0,
+                price_change_30d=market_data.get("price_change_percentage_30d", 0) or 0.0,
+                ath=market_data.get("ath", {}).get("usd", 0) or 0.0,
+                atl=market_data.get("atl", {}).get("usd", 0) or 0.0,
+                last_updated=market_data.get("last_updated", "Unknown") or "Unknown"
+            )
         except Exception as e:
             logger.error(f"Error parsing market data: {e}")
-            return _self._get_fallback_market_data()
+            return self._get_fallback_market_data()
     
-    def _get_fallback_market_data(self) -> Dict[str, Any]:
+    def _get_fallback_market_data(self) -> MarketSnapshot:
         """Return fallback market data when API fails"""
+        return MarketSnapshot()
+    
+    async def _make_request_async(self, session: aiohttp.ClientSession, url: str, params: Dict = None, max_retries: int = None) -> Optional[Dict]:
+        """Make async HTTP request with retry logic"""
+        max_retries = max_retries or self.config.MAX_RETRIES
+
+        for attempt in range(max_retries):
+            try:
+                async with session.get(url, params=params) as response:
+                    response.raise_for_status()
+                    return _json_loads(await response.read())
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Request attempt {attempt + 1} failed: {e}")
+                if attempt == max_retries - 1:
+                    logger.error(f"All {max_retries} attempts failed for {url}")
+                    return None
+                await asyncio.sleep(self.config.RETRY_DELAY * (attempt + 1))
+
+        return None
+
+    async def get_price_async(self, session: aiohttp.ClientSession, token_symbol: str) -> PriceSnapshot:
+        """Fetch current price from Binance (async), falling back to CoinGecko"""
+        url = self.config.get_binance_url("ticker/24hr")
+        params = {"symbol": f"{token_symbol.upper()}USDT"}
+
+        data = await self._make_request_async(session, url, params)
+        if data:
+            try:
+                return self._parse_binance_price(data)
+            except Exception as e:
+                logger.warning(f"Binance price fetch failed: {e}")
+
+        # Fallback to CoinGecko
+        symbol_lower = token_symbol.lower()
+        url = self.config.get_coingecko_url("simple/price")
+        params = {
+            "ids": symbol_lower,
+            "vs_currencies": "usd",
+            "include_24hr_change": "true",
+            "include_24hr_vol": "true"
+        }
+
+        data = await self._make_request_async(session, url, params)
+        if data and symbol_lower in data:
+            return self._parse_coingecko_price(data[symbol_lower])
+
+        return self._get_fallback_price_data()
+
+    async def get_market_data_async(self, session: aiohttp.ClientSession, token_id: str) -> MarketSnapshot:
+        """Fetch comprehensive market data from CoinGecko (async)"""
+        url = self.config.get_coingecko_url(f"coins/{token_id.lower()}")
+        params = {
+            "localization": "false",
+            "tickers": "false",
+            "market_data": "true",
+            "community_data": "false",
+            "developer_data": "false",
+            "sparkline": "false"
+        }
+
+        data = await self._make_request_async(session, url, params)
+        if not data:
+            return self._get_fallback_market_data()
+
+        return self._parse_market_data(data)
+
+    def _parse_coins_price(self, data: Dict) -> PriceSnapshot:
+        """Derive a price snapshot from a CoinGecko coins/{id} payload"""
+        market_data = data.get("market_data", {})
+        return PriceSnapshot(
+            price=market_data.get("current_price", {}).get("usd", 0) or 0.0,
+            change_24h=market_data.get("price_change_percentage_24h", 0) or 0.0,
+            volume_24h=market_data.get("total_volume", {}).get("usd", 0) or 0.0,
+            high_24h=market_data.get("high_24h", {}).get("usd", 0) or 0.0,
+            low_24h=market_data.get("low_24h", {}).get("usd", 0) or 0.0,
+            source="CoinGecko"
+        )
+
+    async def get_snapshot_async(self, session: aiohttp.ClientSession, token_info: Dict[str, str]) -> tuple:
+        """Fetch price and market snapshots from one coins/{id} call
+
+        The coins/{id} payload already carries everything the separate
+        Binance ticker call provided (price, 24h change, volume, high,
+        low), so a single round-trip fills both snapshots. Binance is
+        kept only as the price fallback for when CoinGecko is down or
+        rate-limited.
+        """
+        url = self.config.get_coingecko_url(f"coins/{token_info['id'].lower()}")
+        params = {
+            "localization": "false",
+            "tickers": "false",
+            "market_data": "true",
+            "community_data": "false",
+            "developer_data": "false",
+            "sparkline": "false"
+        }
+
+        data = await self._make_request_async(session, url, params)
+        if data:
+            return self._parse_coins_price(data), self._parse_market_data(data)
+
+        price_data = await self.get_price_async(session, token_info['symbol'])
+        return price_data, self._get_fallback_market_data()
+
+    async def get_news_async(self, session: aiohttp.ClientSession, coin_name: str, limit: int = 10) -> List[NewsItem]:
+        """Fetch cryptocurrency news from CryptoPanic (async)"""
+        if not self.config.api_keys.CRYPTOPANIC:
+            return self._get_no_api_key_news(coin_name)
+
+        for i, method in enumerate(self._NEWS_METHODS):
+            try:
+                params = self._build_news_params(method, coin_name)
+                data = await self._make_request_async(session, self._NEWS_URL, params)
+
+                if data and "results" in data:
+                    results = data.get("results", [])
+                    if results:
+                        news_items = self._extract_news_items(results, coin_name, limit, filter_general=(i == 3))
+                        if news_items:
+                            return news_items
+
+            except Exception as e:
+                logger.warning(f"CryptoPanic method {i+1} failed: {e}")
+                continue
+
+        return self._get_fallback_news(coin_name)
+
+    async def fetch_all(self, token_info: Dict[str, str]) -> tuple:
+        """Fetch snapshots and news concurrently over one aiohttp session.
+
+        Price and market data come from a single coins/{id} call, so the
+        fetch phase is two concurrent requests instead of three, and
+        latency is the max of the pair rather than the sum.
+        """
+        timeout = aiohttp.ClientTimeout(total=self.config.REQUEST_TIMEOUT)
+        async with aiohttp.ClientSession(
+            timeout=timeout,
+            headers={'User-Agent': 'AI-Crypto-Assistant/2.0'}
+        ) as session:
+            snapshots, news_data = await asyncio.gather(
+                self.get_snapshot_async(session, token_info),
+                self.get_news_async(session, token_info['name']),
+                return_exceptions=True
+            )
+
+        if isinstance(snapshots, Exception):
+            logger.error(f"Error fetching snapshots: {snapshots}")
+            price_data = self._get_fallback_price_data()
+            market_data = self._get_fallback_market_data()
+        else:
+            price_data, market_data = snapshots
+        if isinstance(news_data, Exception):
+            logger.error(f"Error fetching news data: {news_data}")
+            news_data = self._get_fallback_news(token_info['name'])
+
+        return price_data, market_data, news_data
+
+    async def aget_comprehensive_data(self, token_info: Dict[str, str]) -> Dict[str, Any]:
+        """Async variant of get_comprehensive_data for event-loop callers"""
+        price_data, market_data, news_data = await self.fetch_all(token_info)
         return {
-            "market_cap": 0,
-            "rank": 0,
-            "total_volume": 0,
-            "circulating_supply": 0,
-            "total_supply": 0,
-            "max_supply": 0,
-            "price_change_24h": 0,
-            "price_change_7d": 0,
-            "price_change_30d": 0,
-            "ath": 0,
-            "atl": 0,
-            "last_updated": "Unknown"
+            'news': news_data,
+            'price': price_data,
+            'market': market_data
         }
-    
+
     def get_comprehensive_data(self, token_info: Dict[str, str]) -> Dict[str, Any]:
-        """Fetch all data concurrently for better performance"""
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            # Submit all requests concurrently
-            future_to_data_type = {
-                executor.submit(self.get_news, token_info['name']): 'news',
-                executor.submit(self.get_price, token_info['symbol']): 'price',
-                executor.submit(self.get_market_data, token_info['id']): 'market'
+        """Fetch all data concurrently for better performance
+
+        Delegates to the aiohttp fan-out instead of spinning up a thread
+        pool per call: the requests are multiplexed on one event loop
+        with keep-alive and no per-call thread creation.
+        """
+        return asyncio.run(self.aget_comprehensive_data(token_info))
+
+    def get_comprehensive_data_batch(self, token_infos: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Comprehensive data for several tokens with one batched price call"""
+        prices = self.get_prices_batch([t['symbol'] for t in token_infos])
+        return [
+            {
+                'news': self.get_news(token_info['name']),
+                'price': prices.get(token_info['symbol'].upper(), self._get_fallback_price_data()),
+                'market': self.get_market_data(token_info['id'])
             }
-            
-            results = {}
-            for future in as_completed(future_to_data_type):
-                data_type = future_to_data_type[future]
-                try:
-                    results[data_type] = future.result()
-                except Exception as e:
-                    logger.error(f"Error fetching {data_type} data: {e}")
-                    results[data_type] = None
-            
-            return results
\ No newline at end of file
+            for token_info in token_infos
+        ]
\ No newline at end of file
@@ -0,0 +1,218 @@
+import functools
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Optional semantic layer: falls back to exact-match only when the
+# embedding stack is not installed
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_AVAILABLE = True
+except ImportError:
+    SEMANTIC_AVAILABLE = False
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Pre-quantized int8 ONNX export shipped with the model on the Hub:
+# ~2x faster per encode on AVX2 CPUs and a fraction of the FP32 memory
+EMBEDDING_ONNX_FILE = "onnx/model_quint8_avx2.onnx"
+
+# One store per user, shared by every Streamlit worker process
+CACHE_DIR = Path.home() / ".cache" / "ai-crypto-assistant"
+
+# In-process LRU layer in front of SQLite; repeat hits within one
+# worker skip the database entirely
+HOT_CAPACITY = 256
+
+class PromptCache:
+    """Cache for Ollama completions with exact and semantic matching
+
+    The LLM call is by far the slowest step of an analysis, yet prompts for
+    the same token and settings are near-identical across sessions. A hit
+    here eliminates a multi-second Ollama round-trip entirely.
+
+    Entries live in SQLite (WAL mode), so opening the cache is O(1)
+    regardless of size, concurrent readers don't block, and the OS page
+    cache shares the store across worker processes.
+    """
+
+    def __init__(
+        self,
+        ttl: int = 3600,
+        db_path: Optional[str] = None,
+        similarity_threshold: float = 0.95
+    ):
+        self.ttl = ttl
+        self.db_path = Path(db_path) if db_path else CACHE_DIR / "prompts.sqlite"
+        self.similarity_threshold = similarity_threshold
+        self._embedder = None
+        self._write_lock = threading.Lock()
+        self._hot: "OrderedDict[str, tuple]" = OrderedDict()
+        self._conn = self._open_db()
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        """Build a stable cache key from model and prompt"""
+        return hashlib.sha256(f"{model}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        """Return a cached completion for the prompt, or None on miss"""
+        key = self.make_key(model, prompt)
+        cutoff = time.time() - self.ttl
+
+        # Hot layer first: a dict hit costs no SQLite round-trip
+        with self._write_lock:
+            entry = self._hot.get(key)
+            if entry is not None:
+                created, response = entry
+                if created >= cutoff:
+                    self._hot.move_to_end(key)
+                    logger.info("Prompt cache: hot hit")
+                    return response
+                del self._hot[key]
+
+        if self._conn is None:
+            return None
+
+        try:
+            row = self._conn.execute(
+                "SELECT created, response FROM prompts WHERE key = ? AND created >= ?",
+                (key, cutoff)
+            ).fetchone()
+        except Exception as e:
+            logger.warning(f"Prompt cache lookup failed: {e}")
+            return None
+
+        if row:
+            logger.info("Prompt cache: exact hit")
+            self._remember_hot(key, row[0], row[1])
+            return row[1]
+
+        return self._semantic_lookup(model, prompt, cutoff)
+
+    def _remember_hot(self, key: str, created: float, response: str):
+        """Record an entry in the in-process LRU layer"""
+        with self._write_lock:
+            self._hot[key] = (created, response)
+            self._hot.move_to_end(key)
+            while len(self._hot) > HOT_CAPACITY:
+                self._hot.popitem(last=False)
+
+    def put(self, model: str, prompt: str, response: str):
+        """Store a completion and drop any expired entries"""
+        if self._conn is None:
+            return
+
+        embedding = None
+        embedder = self._get_embedder()
+        if embedder is not None:
+            try:
+                vector = embedder.encode(prompt, normalize_embeddings=True)
+                embedding = np.asarray(vector, dtype=np.float32).tobytes()
+            except Exception as e:
+                logger.warning(f"Prompt embedding failed: {e}")
+
+        try:
+            with self._write_lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO prompts (key, created, model, prompt, response, embedding) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.make_key(model, prompt), time.time(), model, prompt, response, embedding)
+                )
+                self._conn.execute(
+                    "DELETE FROM prompts WHERE created < ?",
+                    (time.time() - self.ttl,)
+                )
+        except Exception as e:
+            logger.warning(f"Failed to save prompt cache entry: {e}")
+
+    def clear(self):
+        """Drop all cached entries"""
+        if self._conn is None:
+            return
+        with self._write_lock:
+            self._conn.execute("DELETE FROM prompts")
+
+    def _semantic_lookup(self, model: str, prompt: str, cutoff: float) -> Optional[str]:
+        """Find a near-identical cached prompt via cosine similarity"""
+        embedder = self._get_embedder()
+        if embedder is None:
+            return None
+
+        try:
+            # Only compare against entries generated by the same model
+            rows = self._conn.execute(
+                "SELECT response, embedding FROM prompts "
+                "WHERE model = ? AND created >= ? AND embedding IS NOT NULL",
+                (model, cutoff)
+            ).fetchall()
+            if not rows:
+                return None
+
+            query_vec = embedder.encode(prompt, normalize_embeddings=True)
+            matrix = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+            scores = matrix @ query_vec
+            best = int(scores.argmax())
+            if scores[best] >= self.similarity_threshold:
+                logger.info(f"Prompt cache: semantic hit (similarity {scores[best]:.3f})")
+                return rows[best][0]
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+
+        return None
+
+    def _get_embedder(self):
+        """Lazily load the sentence-embedding model if available
+
+        Prefers the int8 ONNX export (needs optimum/onnxruntime); the
+        quantization error is far below the 0.95 similarity threshold,
+        so hits and misses are unchanged.
+        """
+        if not SEMANTIC_AVAILABLE:
+            return None
+        if self._embedder is None:
+            try:
+                self._embedder = SentenceTransformer(
+                    EMBEDDING_MODEL,
+                    backend="onnx",
+                    model_kwargs={"file_name": EMBEDDING_ONNX_FILE},
+                )
+            except Exception:
+                logger.info("Quantized ONNX embedder unavailable, using default backend")
+                try:
+                    self._embedder = SentenceTransformer(EMBEDDING_MODEL)
+                except Exception as e:
+                    logger.warning(f"Failed to load embedding model: {e}")
+                    return None
+        return self._embedder
+
+    def _open_db(self) -> Optional[sqlite3.Connection]:
+        """Open the store in autocommit WAL mode; degrade to memory-only"""
+        for path in (self.db_path, ":memory:"):
+            try:
+                if path != ":memory:":
+                    Path(path).parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS prompts ("
+                    "key TEXT PRIMARY KEY, created REAL, model TEXT, "
+                    "prompt TEXT, response TEXT, embedding BLOB)"
+                )
+                return conn
+            except Exception as e:
+                logger.warning(f"Failed to open prompt cache at {path}: {e}")
+
+        return None
+
+@functools.lru_cache(maxsize=None)
+def get_prompt_cache(ttl: int = 3600) -> PromptCache:
+    """Process-wide shared cache so generators reuse one connection"""
+    return PromptCache(ttl=ttl)
@@ -1,109 +1,132 @@
+import difflib
 import re
 import logging
 from typing import Dict, Optional, List
 from dataclasses import dataclass
 
+# Optional: one-pass multi-pattern matching for fallback extraction
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional: C-implemented batched fuzzy matching for suggestions
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    process = None
+
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Compiled once at import instead of per _clean_query call
+_WORD_RE = re.compile(r'\w+')
+
+# Filler words stripped before the direct-mapping lookup
+_COMMON_WORDS = frozenset({
+    "about", "tell", "me", "what", "is", "the", "price", "of",
+    "analysis", "news", "latest", "current", "today", "now",
+    "cryptocurrency", "crypto", "coin", "token", "currency"
+})
+
+# Translation table for stripping trailing punctuation from words;
+# str.translate avoids the per-call strip loop over the char set
+_STRIP_TABLE = str.maketrans('', '', '.,!?;:')
+
+@dataclass(slots=True)
 class TokenInfo:
     """Token information structure"""
     name: str
     symbol: str
     id: str  # CoinGecko ID
-    aliases: List[str] = None
+
+# One row per token: (name, symbol, CoinGecko id, extra aliases).
+# The alias index fans each row out to every lookup key, so the
+# TokenInfo objects themselves are stored exactly once.
+_TOKEN_TABLE = [
+    # Major cryptocurrencies
+    ("Bitcoin", "BTC", "bitcoin", []),
+    ("Ethereum", "ETH", "ethereum", ["ether"]),
+    ("Binance Coin", "BNB", "binancecoin", ["binance", "binance coin"]),
+    ("Cardano", "ADA", "cardano", []),
+    ("Solana", "SOL", "solana", []),
+    ("Polkadot", "DOT", "polkadot", []),
+    ("Chainlink", "LINK", "chainlink", []),
+    ("Litecoin", "LTC", "litecoin", []),
+    ("Polygon", "MATIC", "matic-network", []),
+    ("Avalanche", "AVAX", "avalanche-2", []),
+    ("Dogecoin", "DOGE", "dogecoin", []),
+    ("Shiba Inu", "SHIB", "shiba-inu", ["shiba", "shiba inu"]),
+    ("XRP", "XRP", "ripple", ["ripple"]),
+
+    # Stablecoins
+    ("Tether", "USDT", "tether", []),
+    ("USD Coin", "USDC", "usd-coin", ["usd coin"]),
+    ("Dai", "DAI", "dai", []),
+
+    # DeFi tokens
+    ("Uniswap", "UNI", "uniswap", []),
+    ("Aave", "AAVE", "aave", []),
+    ("Compound", "COMP", "compound-governance-token", []),
+
+    # Layer 2 & Scaling
+    ("Arbitrum", "ARB", "arbitrum", []),
+    ("Optimism", "OP", "optimism", []),
+]
 
 class QueryHandler:
     """Enhanced query handler with comprehensive token recognition"""
     
     def __init__(self):
-        self.token_mapping = self._initialize_token_mapping()
-        self.query_patterns = self._initialize_query_patterns()
-    
-    def _initialize_token_mapping(self) -> Dict[str, TokenInfo]:
-        """Initialize comprehensive token mapping"""
-        return {
-            # Major cryptocurrencies
-            "bitcoin": TokenInfo("Bitcoin", "BTC", "bitcoin", ["btc", "bitcoin"]),
-            "btc": TokenInfo("Bitcoin", "BTC", "bitcoin", ["btc", "bitcoin"]),
-            
-            "ethereum": TokenInfo("Ethereum", "ETH", "ethereum", ["eth", "ethereum", "ether"]),
-            "eth": TokenInfo("Ethereum", "ETH", "ethereum", ["eth", "ethereum", "ether"]),
-            "ether": TokenInfo("Ethereum", "ETH", "ethereum", ["eth", "ethereum", "ether"]),
-            
-            "binance": TokenInfo("Binance Coin", "BNB", "binancecoin", ["bnb", "binance coin"]),
-            "bnb": TokenInfo("Binance Coin", "BNB", "binancecoin", ["bnb", "binance coin"]),
-            
-            "cardano": TokenInfo("Cardano", "ADA", "cardano", ["ada", "cardano"]),
-            "ada": TokenInfo("Cardano", "ADA", "cardano", ["ada", "cardano"]),
-            
-            "solana": TokenInfo("Solana", "SOL", "solana", ["sol", "solana"]),
-            "sol": TokenInfo("Solana", "SOL", "solana", ["sol", "solana"]),
-            
-            "polkadot": TokenInfo("Polkadot", "DOT", "polkadot", ["dot", "polkadot"]),
-            "dot": TokenInfo("Polkadot", "DOT", "polkadot", ["dot", "polkadot"]),
-            
-            "chainlink": TokenInfo("Chainlink", "LINK", "chainlink", ["link", "chainlink"]),
-            "link": TokenInfo("Chainlink", "LINK", "chainlink", ["link", "chainlink"]),
-            
-            "litecoin": TokenInfo("Litecoin", "LTC", "litecoin", ["ltc", "litecoin"]),
-            "ltc": TokenInfo("Litecoin", "LTC", "litecoin", ["ltc", "litecoin"]),
-            
-            "polygon": TokenInfo("Polygon", "MATIC", "matic-network", ["matic", "polygon"]),
-            "matic": TokenInfo("Polygon", "MATIC", "matic-network", ["matic", "polygon"]),
-            
-            "avalanche": TokenInfo("Avalanche", "AVAX", "avalanche-2", ["avax", "avalanche"]),
-            "avax": TokenInfo("Avalanche", "AVAX", "avalanche-2", ["avax", "avalanche"]),
-            
-            "dogecoin": TokenInfo("Dogecoin", "DOGE", "dogecoin", ["doge", "dogecoin"]),
-            "doge": TokenInfo("Dogecoin", "DOGE", "dogecoin", ["doge", "dogecoin"]),
-            
-            "shiba": TokenInfo("Shiba Inu", "SHIB", "shiba-inu", ["shib", "shiba inu", "shiba"]),
-            "shib": TokenInfo("Shiba Inu", "SHIB", "shiba-inu", ["shib", "shiba inu", "shiba"]),
-            
-            "ripple": TokenInfo("XRP", "XRP", "ripple", ["xrp", "ripple"]),
-            "xrp": TokenInfo("XRP", "XRP", "ripple", ["xrp", "ripple"]),
-            
-            # Stablecoins
-            "usdt": TokenInfo("Tether", "USDT", "tether", ["usdt", "tether"]),
-            "tether": TokenInfo("Tether", "USDT", "tether", ["usdt", "tether"]),
-            
-            "usdc": TokenInfo("USD Coin", "USDC", "usd-coin", ["usdc", "usd coin"]),
-            
-            "dai": TokenInfo("Dai", "DAI", "dai", ["dai"]),
-            
-            # DeFi tokens
-            "uniswap": TokenInfo("Uniswap", "UNI", "uniswap", ["uni", "uniswap"]),
-            "uni": TokenInfo("Uniswap", "UNI", "uniswap", ["uni", "uniswap"]),
-            
-            "aave": TokenInfo("Aave", "AAVE", "aave", ["aave"]),
-            
-            "compound": TokenInfo("Compound", "COMP", "compound-governance-token", ["comp", "compound"]),
-            "comp": TokenInfo("Compound", "COMP", "compound-governance-token", ["comp", "compound"]),
-            
-            # Layer 2 & Scaling
-            "arbitrum": TokenInfo("Arbitrum", "ARB", "arbitrum", ["arb", "arbitrum"]),
-            "arb": TokenInfo("Arbitrum", "ARB", "arbitrum", ["arb", "arbitrum"]),
-            
-            "optimism": TokenInfo("Optimism", "OP", "optimism", ["op", "optimism"]),
-            "op": TokenInfo("Optimism", "OP", "optimism", ["op", "optimism"]),
-        }
+        self._canonical, self._alias_index = self._initialize_token_mapping()
+        self.query_pattern = self._initialize_query_patterns()
+        self._automaton = self._build_automaton()
+
+    def _initialize_token_mapping(self) -> tuple:
+        """Build the canonical token table and the alias index
+
+        Each token is stored once, keyed by CoinGecko id; name, symbol
+        and aliases all point at the canonical entry through a flat
+        string->id index instead of duplicating TokenInfo objects under
+        several keys.
+        """
+        canonical: Dict[str, TokenInfo] = {}
+        alias_index: Dict[str, str] = {}
+
+        for name, symbol, coingecko_id, aliases in _TOKEN_TABLE:
+            canonical[coingecko_id] = TokenInfo(name, symbol, coingecko_id)
+            alias_index[name.lower()] = coingecko_id
+            alias_index[symbol.lower()] = coingecko_id
+            for alias in aliases:
+                alias_index[alias.lower()] = coingecko_id
+
+        return canonical, alias_index
+
+    def _lookup(self, key: str) -> Optional[TokenInfo]:
+        """Resolve a lookup key through the alias index"""
+        coingecko_id = self._alias_index.get(key)
+        return self._canonical[coingecko_id] if coingecko_id else None
     
-    def _initialize_query_patterns(self) -> List[str]:
-        """Initialize query patterns for better token extraction"""
-        return [
-            r"about\s+(\w+)",
-            r"tell.*about\s+(\w+)",
-            r"what.*is\s+(\w+)",
-            r"price.*of\s+(\w+)",
-            r"analysis.*of\s+(\w+)",
-            r"(\w+)\s+price",
-            r"(\w+)\s+analysis",
-            r"(\w+)\s+news",
-            r"buy\s+(\w+)",
-            r"sell\s+(\w+)",
-            r"(\w+)(?:\s+cryptocurrency|\s+crypto|\s+coin|\s+token)?$"
+    def _initialize_query_patterns(self) -> re.Pattern:
+        """Initialize the query pattern for better token extraction
+
+        The individual patterns are fused into one compiled alternation
+        with named groups, so extraction makes a single scan over the
+        query instead of one full scan per pattern.
+        """
+        alternatives = [
+            r"about\s+(?P<p0>\w+)",
+            r"tell.*about\s+(?P<p1>\w+)",
+            r"what.*is\s+(?P<p2>\w+)",
+            r"price.*of\s+(?P<p3>\w+)",
+            r"analysis.*of\s+(?P<p4>\w+)",
+            r"(?P<p5>\w+)\s+price",
+            r"(?P<p6>\w+)\s+analysis",
+            r"(?P<p7>\w+)\s+news",
+            r"buy\s+(?P<p8>\w+)",
+            r"sell\s+(?P<p9>\w+)",
+            r"(?P<p10>\w+)(?:\s+cryptocurrency|\s+crypto|\s+coin|\s+token)?$"
         ]
+        return re.compile("|".join(f"(?:{alt})" for alt in alternatives), re.IGNORECASE)
     
     def extract_token_info(self, query: str) -> Optional[Dict[str, str]]:
         """Extract token information from user query"""
@@ -133,65 +156,71 @@ class QueryHandler:
         """Check for direct token mapping"""
         # Remove common words
         cleaned_query = self._clean_query(query)
-        
-        for token_key, token_info in self.token_mapping.items():
-            if token_key == cleaned_query:
-                return token_info
-            
-            # Check aliases
-            if token_info.aliases:
-                for alias in token_info.aliases:
-                    if alias.lower() == cleaned_query:
-                        return token_info
-        
-        return None
+        return self._lookup(cleaned_query)
     
     def _extract_using_patterns(self, query: str) -> Optional[TokenInfo]:
-        """Extract token using regex patterns"""
-        for pattern in self.query_patterns:
-            match = re.search(pattern, query, re.IGNORECASE)
-            if match:
-                token_candidate = match.group(1).lower()
-                if token_candidate in self.token_mapping:
-                    return self.token_mapping[token_candidate]
-        
+        """Extract token using the combined query pattern"""
+        for match in self.query_pattern.finditer(query):
+            # Exactly one named group is set per match
+            for token_candidate in match.groupdict().values():
+                if token_candidate:
+                    token_info = self._lookup(token_candidate.lower())
+                    if token_info:
+                        return token_info
+
         return None
     
+    def _build_automaton(self):
+        """Build an Aho-Corasick automaton over the token keys
+
+        Lets the partial-match fallback scan the whole query once
+        against every known token, instead of a substring test per
+        token per word. Returns None when pyahocorasick is missing.
+        """
+        if ahocorasick is None:
+            return None
+
+        automaton = ahocorasick.Automaton()
+        for alias, coingecko_id in self._alias_index.items():
+            automaton.add_word(alias, self._canonical[coingecko_id])
+        automaton.make_automaton()
+        return automaton
+
     def _fallback_extraction(self, query: str) -> Optional[TokenInfo]:
         """Fallback extraction method"""
         words = query.split()
-        
-        # Check each word against token mapping
+
+        # Check each word against the alias index; the query is already
+        # lowercased at the entry point
         for word in words:
-            cleaned_word = word.lower().strip(".,!?;:")
-            if cleaned_word in self.token_mapping:
-                return self.token_mapping[cleaned_word]
-        
+            token_info = self._lookup(word.translate(_STRIP_TABLE))
+            if token_info:
+                return token_info
+
         # Check for partial matches
-        for word in words:
-            cleaned_word = word.lower().strip(".,!?;:")
-            for token_key, token_info in self.token_mapping.items():
-                if cleaned_word in token_key or token_key in cleaned_word:
-                    return token_info
-        
+        if self._automaton is not None:
+            for _, token_info in self._automaton.iter(query):
+                return token_info
+        else:
+            for word in words:
+                cleaned_word = word.translate(_STRIP_TABLE)
+                for alias, coingecko_id in self._alias_index.items():
+                    if cleaned_word in alias or alias in cleaned_word:
+                        return self._canonical[coingecko_id]
+
         return None
     
     def _clean_query(self, query: str) -> str:
-        """Clean query by removing common words and punctuation"""
-        common_words = {
-            "about", "tell", "me", "what", "is", "the", "price", "of", 
-            "analysis", "news", "latest", "current", "today", "now",
-            "cryptocurrency", "crypto", "coin", "token", "currency"
-        }
-        
-        # Remove punctuation and split
-        cleaned = re.sub(r'[^\w\s]', '', query)
-        words = cleaned.split()
-        
-        # Filter out common words
-        filtered_words = [word for word in words if word.lower() not in common_words]
-        
-        return " ".join(filtered_words).strip()
+        """Clean query by removing common words and punctuation
+
+        One regex pass tokenizes and drops punctuation at once; the
+        query is already lowercased at the entry point, so each word
+        needs only a frozenset lookup.
+        """
+        return " ".join(
+            word for word in _WORD_RE.findall(query)
+            if word not in _COMMON_WORDS
+        )
     
     def _token_info_to_dict(self, token_info: TokenInfo) -> Dict[str, str]:
         """Convert TokenInfo to dictionary"""
@@ -203,30 +232,48 @@ class QueryHandler:
     
     def add_custom_token(self, name: str, symbol: str, coingecko_id: str, aliases: List[str] = None):
         """Add custom token to mapping"""
-        token_info = TokenInfo(name, symbol, coingecko_id, aliases or [])
-        self.token_mapping[name.lower()] = token_info
-        self.token_mapping[symbol.lower()] = token_info
-        
+        self._canonical[coingecko_id] = TokenInfo(name, symbol, coingecko_id)
+        self._alias_index[name.lower()] = coingecko_id
+        self._alias_index[symbol.lower()] = coingecko_id
+
         if aliases:
             for alias in aliases:
-                self.token_mapping[alias.lower()] = token_info
-    
+                self._alias_index[alias.lower()] = coingecko_id
+
+        # Automata are immutable once built, so rebuild with the new keys
+        self._automaton = self._build_automaton()
+
     def get_supported_tokens(self) -> List[str]:
         """Get list of supported token names"""
-        unique_tokens = set()
-        for token_info in self.token_mapping.values():
-            unique_tokens.add(f"{token_info.name} ({token_info.symbol})")
-        return sorted(list(unique_tokens))
-    
+        return sorted(
+            f"{token_info.name} ({token_info.symbol})"
+            for token_info in self._canonical.values()
+        )
+
     def suggest_similar_tokens(self, query: str) -> List[str]:
-        """Suggest similar tokens based on partial matching"""
+        """Suggest similar tokens based on fuzzy matching
+
+        rapidfuzz scores every alias in one C-level batch; difflib is
+        the stdlib fallback. Candidates are deduplicated by canonical
+        id rather than by formatted string.
+        """
         query = query.lower()
+
+        if process is not None:
+            matches = process.extract(query, list(self._alias_index), scorer=fuzz.WRatio, limit=10)
+            candidates = [alias for alias, score, _ in matches if score >= 60]
+        else:
+            candidates = difflib.get_close_matches(query, self._alias_index, n=10, cutoff=0.6)
+
+        seen_ids = set()
         suggestions = []
-        
-        for token_key, token_info in self.token_mapping.items():
-            if query in token_key or token_key in query:
-                suggestion = f"{token_info.name} ({token_info.symbol})"
-                if suggestion not in suggestions:
-                    suggestions.append(suggestion)
-        
-        return suggestions[:5]  # Return top 5 suggestions
\ No newline at end of file
+        for alias in candidates:
+            coingecko_id = self._alias_index[alias]
+            if coingecko_id not in seen_ids:
+                seen_ids.add(coingecko_id)
+                token_info = self._canonical[coingecko_id]
+                suggestions.append(f"{token_info.name} ({token_info.symbol})")
+            if len(suggestions) == 5:
+                break
+
+        return suggestions
\ No newline at end of file
@@ -1,108 +1,254 @@
-import requests
+import asyncio
+import aiohttp
+import concurrent.futures
+import functools
+import hashlib
+import httpx
 import json
 import logging
+import string
+import threading
+import time
+import types
 from typing import Dict, Any, List, Optional
 import streamlit as st
 
+from assistant import batcher
+from assistant.data_fetcher import MarketSnapshot, NewsItem, PriceSnapshot
+from assistant.prompt_cache import get_prompt_cache
+
+# C-accelerated JSON for the multi-KB prompts and completions that
+# cross the Ollama boundary on every call; stdlib json as fallback
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# Template mappings for different languages. Built once at import and
+# wrapped read-only, instead of re-evaluated per instantiation
+_TEMPLATES = types.MappingProxyType({
+    "russian": {
+        "system_prompt": "Ты эксперт-аналитик криптовалют. Предоставляй точную, объективную и полезную информацию.",
+        "analysis_intro": "Анализ криптовалюты:",
+        "sections": {
+            "overview": "📊 Обзор",
+            "price_analysis": "💰 Анализ цены",
+            "market_data": "📈 Рыночные данные",
+            "news_summary": "📰 Новости",
+            "technical_analysis": "🔍 Технический анализ",
+            "risks": "⚠️ Риски",
+            "conclusion": "💡 Заключение"
+        }
+    },
+    "english": {
+        "system_prompt": "You are a cryptocurrency expert analyst. Provide accurate, objective, and helpful information.",
+        "analysis_intro": "Cryptocurrency Analysis:",
+        "sections": {
+            "overview": "📊 Overview",
+            "price_analysis": "💰 Price Analysis",
+            "market_data": "📈 Market Data",
+            "news_summary": "📰 News Summary",
+            "technical_analysis": "🔍 Technical Analysis",
+            "risks": "⚠️ Risks",
+            "conclusion": "💡 Conclusion"
+        }
+    }
+})
+
+# Payload builders and response extractors per endpoint format, so the
+# fallback loop dispatches through callables instead of re-branching on
+# a format string for every attempt
+def _build_generate(model: str, prompt: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "model": model,
+        "prompt": prompt,
+        "stream": False,
+        "keep_alive": "10m",  # Hold model + KV cache between calls
+        "options": options
+    }
+
+def _build_chat(model: str, prompt: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "stream": False,
+        "keep_alive": "10m",
+        "options": options
+    }
+
+def _extract_generate(result: Dict[str, Any]) -> str:
+    return result.get("response", "")
+
+def _extract_chat(result: Dict[str, Any]) -> str:
+    return result.get("message", {}).get("content", "")
+
+# Endpoints tried in order of preference by the fallback path
+_ENDPOINTS = (
+    ("http://127.0.0.1:11434/api/generate", _build_generate, _extract_generate),
+    ("http://127.0.0.1:11434/api/chat", _build_chat, _extract_chat)
+)
+
+# Decode budget per analysis depth; decode time is linear in tokens
+# generated, so brief analyses should not pay for a flat 400-token cap
+_NUM_PREDICT = {"basic": 160, "detailed": 320, "comprehensive": 500}
+
+# Pre-parsed once at import; substitution is then a single C-level pass
+# instead of re-executing the f-string build ops per call
+_SUFFIX_TEMPLATE = string.Template("""
+$analysis_intro $name ($symbol)
+
+ДАННЫЕ ДЛЯ АНАЛИЗА:
+$market_summary
+
+ПОСЛЕДНИЕ НОВОСТИ:
+$news_summary
+""")
+
+# Canned fallback responses, built once instead of per failure
+_CONNECTION_ERROR_RESPONSE = """
+🔌 **Ollama Подключение Недоступно**
+
+Не удается подключиться к Ollama серверу.
+
+**Быстрое решение:**
+1. Откройте новый терминал и запустите: `ollama serve`
+2. Проверьте доступность: http://localhost:11434
+3. Убедитесь что модель загружена: `ollama pull llama2`
+
+**Текущие данные выше остаются актуальными для анализа.**
+""".strip()
+
+_TIMEOUT_ERROR_RESPONSE = """
+⏱️ **Ollama Генерация Заняла Слишком Много Времени**
+
+**Возможные решения:**
+1. **Перезапустить Ollama:** Остановите (Ctrl+C) и снова `ollama serve`
+2. **Попробовать более быструю модель:** `ollama pull phi` или `ollama pull llama2:7b-chat`
+3. **Проверить загрузку системы** - возможно модель перегружена
+
+**Рыночные данные выше показывают текущую ситуацию.**
+
+**💡 Краткий анализ на основе данных:**
+Если цена показывает положительную динамику (+4.63%), это указывает на bullish настроения.
+Высокая рыночная капитализация и объемы торгов говорят о здоровом интересе к активу.
+""".strip()
+
 class ResponseGenerator:
     """Fixed response generator with better Ollama handling"""
     
     def __init__(self, config):
         self.config = config
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'User-Agent': 'AI-Crypto-Assistant/2.0'
-        })
-        
-        # Template mappings for different languages
-        self.templates = {
-            "russian": {
-                "system_prompt": "Ты эксперт-аналитик криптовалют. Предоставляй точную, объективную и полезную информацию.",
-                "analysis_intro": "Анализ криптовалюты:",
-                "sections": {
-                    "overview": "📊 Обзор",
-                    "price_analysis": "💰 Анализ цены",
-                    "market_data": "📈 Рыночные данные",
-                    "news_summary": "📰 Новости",
-                    "technical_analysis": "🔍 Технический анализ",
-                    "risks": "⚠️ Риски",
-                    "conclusion": "💡 Заключение"
-                }
-            },
-            "english": {
-                "system_prompt": "You are a cryptocurrency expert analyst. Provide accurate, objective, and helpful information.",
-                "analysis_intro": "Cryptocurrency Analysis:",
-                "sections": {
-                    "overview": "📊 Overview",
-                    "price_analysis": "💰 Price Analysis",
-                    "market_data": "📈 Market Data",
-                    "news_summary": "📰 News Summary",
-                    "technical_analysis": "🔍 Technical Analysis",
-                    "risks": "⚠️ Risks",
-                    "conclusion": "💡 Conclusion"
-                }
+        # HTTP/2 client with keep-alive so repeated Ollama calls reuse
+        # one multiplexed connection instead of re-handshaking
+        self.session = httpx.Client(
+            transport=httpx.HTTPTransport(
+                http2=True,
+                retries=2,
+                limits=httpx.Limits(
+                    max_connections=32,
+                    max_keepalive_connections=16,
+                    keepalive_expiry=60
+                )
+            ),
+            headers={
+                'Content-Type': 'application/json',
+                'User-Agent': 'AI-Crypto-Assistant/2.0'
             }
-        }
-    
-    def test_ollama_connection(self) -> bool:
-        """Test if Ollama is accessible"""
+        )
+        self.prompt_cache = get_prompt_cache(ttl=config.CACHE_TTL * 12)  # 1 hour
+        # One cached /api/tags result feeds both the connection test
+        # and the model list; (timestamp, (ok, models))
+        self._tags_cache: Optional[tuple] = None
+        # Concurrent identical prompts share one in-flight generation;
+        # followers wait on the leader's future instead of re-issuing
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._inflight_lock = threading.Lock()
+        # Circuit breaker: after repeated connection failures, fail
+        # fast for a cooldown instead of paying full timeouts per rerun
+        self._breaker_fails = 0
+        self._breaker_opened_at = float("-inf")
+
+        # Shared read-only template table; per-call lookup is one .get
+        self.templates = _TEMPLATES
+        self._default_template = _TEMPLATES["russian"]
+
+    def _tags(self) -> tuple:
+        """Fetch /api/tags once and reuse it for 30s
+
+        The connection test and the model list both come from the same
+        endpoint; a page load was paying two or three round-trips for
+        data that rarely changes. Returns (ok, models).
+        """
+        now = time.monotonic()
+        if self._tags_cache is not None and now - self._tags_cache[0] < 30:
+            return self._tags_cache[1]
+
+        ok, models = False, ["llama2"]
         try:
             response = self.session.get("http://127.0.0.1:11434/api/tags", timeout=5)
-            return response.status_code == 200
+            ok = response.status_code == 200
+            if ok:
+                data = _json_loads(response.content)
+                models = [model["name"] for model in data.get("models", [])]
         except Exception as e:
-            logger.warning(f"Ollama connection test failed: {e}")
-            return False
-    
+            logger.warning(f"Ollama tags request failed: {e}")
+
+        self._tags_cache = (now, (ok, models))
+        return ok, models
+
+    def test_ollama_connection(self) -> bool:
+        """Test if Ollama is accessible (result cached for 30s)"""
+        return self._tags()[0]
+
     def get_available_models(self) -> List[str]:
-        """Get list of available models"""
-        try:
-            response = self.session.get("http://127.0.0.1:11434/api/tags", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                return [model["name"] for model in data.get("models", [])]
-        except Exception as e:
-            logger.warning(f"Failed to get models: {e}")
-        return ["llama2"]
+        """Get list of available models (result cached for 30s)"""
+        return self._tags()[1]
     
     def create_analysis_prompt(
         self, 
-        token_info: Dict[str, str], 
-        market_data: Dict[str, Any], 
-        price_data: Dict[str, Any], 
-        news_data: List[Dict[str, Any]], 
+        token_info: Dict[str, str],
+        market_data: MarketSnapshot,
+        price_data: PriceSnapshot,
+        news_data: List[NewsItem],
         language: str = "russian", 
         depth: str = "detailed"
     ) -> str:
-        """Create comprehensive analysis prompt"""
-        
-        template = self.templates.get(language, self.templates["russian"])
-        
-        # Format market data
-        market_summary = self._format_market_data(market_data, price_data, language)
-        
-        # Format news summary
-        news_summary = self._format_news_summary(news_data, language)
-        
-        # Create depth-specific instructions
-        depth_instructions = self._get_depth_instructions(depth, language)
-        
-        prompt = f"""
-{template['system_prompt']}
+        """Create comprehensive analysis prompt
 
-{template['analysis_intro']} {token_info['name']} ({token_info['symbol']})
+        The static instructional preamble comes first and the per-query
+        market data last, so successive prompts with the same settings
+        share a byte-identical prefix that Ollama's KV cache can reuse.
+        """
+        suffix = self._dynamic_suffix(token_info, market_data, price_data, news_data, language)
+        # Short content hash makes prefix-cache hits verifiable in logs:
+        # identical data must produce an identical suffix (and hash)
+        content_hash = hashlib.blake2b(suffix.encode("utf-8")).hexdigest()[:8]
+        logger.info(f"Prompt suffix content hash: {content_hash}")
 
-ДАННЫЕ ДЛЯ АНАЛИЗА:
-{market_summary}
+        return self._static_prefix(language, depth) + "\n---\n" + suffix
 
-ПОСЛЕДНИЕ НОВОСТИ:
-{news_summary}
+    @functools.lru_cache(maxsize=None)
+    def _static_prefix(self, language: str, depth: str) -> str:
+        """Assemble the static instructional preamble
+
+        Memoized: the prefix is byte-identical for a given language and
+        depth, so repeat analyses skip the string assembly entirely.
+        """
+        template = self.templates.get(language, self._default_template)
+        depth_instructions = self._get_depth_instructions(depth, language)
+
+        return f"""
+{template['system_prompt']}
 
 {depth_instructions}
 
-ВАЖНО: 
+ВАЖНО:
 - Используй только предоставленные данные
 - Будь объективным и сбалансированным
 - Не давай финансовых советов
@@ -111,45 +257,99 @@ class ResponseGenerator:
 
 Ответь кратко но содержательно (максимум 300 слов).
 """
-        
-        return prompt
-    
-    def _format_market_data(self, market_data: Dict[str, Any], price_data: Dict[str, Any], language: str) -> str:
-        """Format market data for prompt"""
+
+    def _dynamic_suffix(
+        self,
+        token_info: Dict[str, str],
+        market_data: MarketSnapshot,
+        price_data: PriceSnapshot,
+        news_data: List[NewsItem],
+        language: str
+    ) -> str:
+        """Assemble the per-query data block appended after the prefix"""
+        template = self.templates.get(language, self._default_template)
+        market_summary = self._format_market_data(market_data, price_data, language)
+        news_summary = self._format_news_summary(news_data, language)
+
+        return _SUFFIX_TEMPLATE.substitute(
+            analysis_intro=template['analysis_intro'],
+            name=token_info['name'],
+            symbol=token_info['symbol'],
+            market_summary=market_summary,
+            news_summary=news_summary
+        )
+
+    @functools.lru_cache(maxsize=4)
+    def _market_template(self, language: str) -> str:
+        """Return the market-data skeleton for a language
+
+        Memoized so each call formats values into a prebuilt template
+        instead of reassembling the f-string skeleton from scratch.
+        Value formatting lives in _format_market_data so missing fields
+        can be coerced to a sentinel before substitution.
+        """
         if language == "russian":
-            return f"""
-💰 Текущая цена: ${price_data.get('price', 'N/A')}
-📊 Изменение за 24ч: {price_data.get('change_24h', 0):.2f}%
-🏆 Рейтинг по капитализации: #{market_data.get('rank', 'N/A')}
-💎 Рыночная капитализация: ${market_data.get('market_cap', 0):,.0f}
-📈 Объем торгов 24ч: ${market_data.get('total_volume', 0):,.0f}
-🔄 В обращении: {market_data.get('circulating_supply', 0):,.0f}
+            return """
+💰 Текущая цена: ${price}
+📊 Изменение за 24ч: {change_24h}%
+🏆 Рейтинг по капитализации: #{rank}
+💎 Рыночная капитализация: ${market_cap}
+📈 Объем торгов 24ч: ${total_volume}
+🔄 В обращении: {circulating_supply}
 """
-        else:
-            return f"""
-💰 Current Price: ${price_data.get('price', 'N/A')}
-📊 24h Change: {price_data.get('change_24h', 0):.2f}%
-🏆 Market Cap Rank: #{market_data.get('rank', 'N/A')}
-💎 Market Cap: ${market_data.get('market_cap', 0):,.0f}
-📈 24h Volume: ${market_data.get('total_volume', 0):,.0f}
-🔄 Circulating Supply: {market_data.get('circulating_supply', 0):,.0f}
+        return """
+💰 Current Price: ${price}
+📊 24h Change: {change_24h}%
+🏆 Market Cap Rank: #{rank}
+💎 Market Cap: ${market_cap}
+📈 24h Volume: ${total_volume}
+🔄 Circulating Supply: {circulating_supply}
 """
+
+    @staticmethod
+    def _fmt(value, spec: str) -> str:
+        """Format a numeric field deterministically; missing becomes N/A
+
+        The snapshots default absent fields to 0, so zero is treated as
+        missing here — a fixed sentinel keeps the prompt bytes stable
+        instead of varying between 0, 0.0 and 0.00 renderings.
+        """
+        return format(value, spec) if value else "N/A"
+
+    def _format_market_data(self, market_data: "MarketSnapshot", price_data: "PriceSnapshot", language: str) -> str:
+        """Format market data with fixed field order and formats
+
+        Byte-identical output for identical data keeps Ollama's prefix
+        cache effective; nothing here depends on dict iteration order.
+        """
+        return self._market_template(language).format(
+            price=self._fmt(price_data.price, ",.2f"),
+            change_24h=self._fmt(price_data.change_24h, "+.2f"),
+            rank=self._fmt(market_data.rank, "d"),
+            market_cap=self._fmt(market_data.market_cap, ",.0f"),
+            total_volume=self._fmt(market_data.total_volume, ",.0f"),
+            circulating_supply=self._fmt(market_data.circulating_supply, ",.0f")
+        )
     
-    def _format_news_summary(self, news_data: List[Dict[str, Any]], language: str) -> str:
+    def _format_news_summary(self, news_data: List[NewsItem], language: str) -> str:
         """Format news data for prompt"""
         if not news_data:
             return "Новости недоступны" if language == "russian" else "No news available"
-        
-        news_text = ""
-        for i, article in enumerate(news_data[:3], 1):
-            title = article.get('title', 'No title')
-            source = article.get('source', 'Unknown source')
-            news_text += f"{i}. {title} ({source})\n"
-        
-        return news_text
+
+        # Stable ordering: upstream feeds can reshuffle equally-recent
+        # items between fetches, which would change the prompt bytes
+        articles = sorted(news_data[:3], key=lambda article: article.title)
+
+        # str.join builds the block in one C-level pass instead of
+        # reallocating on every +=
+        return "\n".join(
+            f"{i}. {article.title} ({article.source})"
+            for i, article in enumerate(articles, 1)
+        ) + "\n"
     
+    @functools.lru_cache(maxsize=8)
     def _get_depth_instructions(self, depth: str, language: str) -> str:
-        """Get analysis depth instructions"""
+        """Get analysis depth instructions (constant per depth/language)"""
         if language == "russian":
             instructions = {
                 "basic": "Предоставь краткий обзор (2-3 абзаца) с основными метриками и выводами.",
@@ -164,122 +364,279 @@ class ResponseGenerator:
             }
         
         return instructions.get(depth, instructions["detailed"])
-    
-    def generate_response(self, prompt: str, model: str = None, max_retries: int = 2) -> str:
-        """Generate response using Ollama API with improved error handling"""
+
+    def _generation_options(self, prompt: str, depth: str) -> Dict[str, Any]:
+        """Build generation options scaled to the requested depth
+
+        num_predict tracks the depth's word budget, and num_ctx is
+        sized to the actual prompt so short prompts don't allocate the
+        default 4K KV cache. A mild repeat penalty discourages padding
+        past the budget.
+        """
+        return {
+            "temperature": 0.7,
+            "top_p": 0.9,
+            "num_predict": _NUM_PREDICT.get(depth, _NUM_PREDICT["detailed"]),
+            "num_ctx": min(2048, len(prompt) // 3 + 512),
+            "repeat_penalty": 1.05,
+            "stop": ["\n\n\n"],
+            "cache_prompt": True
+        }
+
+    def generate_response(self, prompt: str, model: str = None, max_retries: int = 2, depth: str = "detailed") -> str:
+        """Generate response using Ollama API with improved error handling
+
+        Identical prompts arriving while a generation is in flight are
+        deduplicated: the first caller runs the request, later callers
+        block on its future and share the result.
+        """
         model = model or "llama2"
-        
-        # First test connection
-        if not self.test_ollama_connection():
+
+        # Check the prompt cache before paying for an Ollama round-trip
+        cached_response = self.prompt_cache.get(model, prompt)
+        if cached_response is not None:
+            return cached_response
+
+        # Open breaker short-circuits to the canned error in
+        # microseconds instead of hanging through connect timeouts
+        if time.monotonic() - self._breaker_opened_at < 30:
             return self._get_connection_error_response()
-        
+
+        key = self.prompt_cache.make_key(model, prompt)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            logger.info("Joining in-flight generation for identical prompt")
+            try:
+                return future.result(timeout=65)
+            except concurrent.futures.TimeoutError:
+                return self._get_timeout_error_response()
+
+        try:
+            result = self._generate_uncached(prompt, model, depth)
+            self._record_breaker(result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _record_breaker(self, result: str):
+        """Track consecutive connection failures; open after three
+
+        The canned connection-error response is a module constant, so
+        an identity check is enough to recognize it.
+        """
+        if result is _CONNECTION_ERROR_RESPONSE:
+            self._breaker_fails += 1
+            if self._breaker_fails >= 3:
+                self._breaker_opened_at = time.monotonic()
+                logger.warning("Ollama unreachable; failing fast for the next 30s")
+        else:
+            self._breaker_fails = 0
+            self._breaker_opened_at = float("-inf")
+
+    def _generate_uncached(self, prompt: str, model: str, depth: str) -> str:
+        """Issue one generation against Ollama, bypassing the caches"""
+        # No pre-flight /api/tags check here: the real POST surfaces
+        # connection failures itself without the extra round-trip
+        # Route through the shared batcher so concurrent sessions are
+        # coalesced instead of hitting Ollama one by one
+        try:
+            generated_text = batcher.submit_sync(
+                prompt,
+                model,
+                options=self._generation_options(prompt, depth)
+            )
+            if generated_text:
+                self.prompt_cache.put(model, prompt, generated_text)
+                return generated_text
+        except Exception as e:
+            logger.warning(f"Batched generation failed, falling back to direct call: {e}")
+
         # Try different endpoints in order of preference
-        endpoints = [
-            {
-                "url": "http://127.0.0.1:11434/api/generate",
-                "data_format": "generate"
-            },
-            {
-                "url": "http://127.0.0.1:11434/api/chat", 
-                "data_format": "chat"
-            }
-        ]
-        
-        for endpoint_info in endpoints:
+        options = self._generation_options(prompt, depth)
+        saw_connection_error = False
+        for url, build_payload, extract_text in _ENDPOINTS:
             try:
-                logger.info(f"Trying endpoint: {endpoint_info['url']}")
-                
-                if endpoint_info["data_format"] == "generate":
-                    data = {
-                        "model": model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.7,
-                            "top_p": 0.9,
-                            "num_predict": 400,  # Reasonable limit for faster response
-                            "stop": ["\n\n\n"]  # Stop at triple newlines
-                        }
-                    }
-                else:  # chat format
-                    data = {
-                        "model": model,
-                        "messages": [{"role": "user", "content": prompt}],
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.7,
-                            "num_predict": 400
-                        }
-                    }
-                
+                logger.info(f"Trying endpoint: {url}")
+
                 response = self.session.post(
-                    endpoint_info["url"], 
-                    json=data, 
+                    url,
+                    content=_json_dumps(build_payload(model, prompt, options)),
                     timeout=60  # Increased timeout for generation
                 )
-                
+
                 if response.status_code == 200:
-                    result = response.json()
-                    
-                    # Extract response based on endpoint format
-                    if endpoint_info["data_format"] == "generate":
-                        generated_text = result.get("response", "")
-                    else:  # chat format
-                        generated_text = result.get("message", {}).get("content", "")
-                    
+                    generated_text = extract_text(_json_loads(response.content))
+
                     if generated_text and generated_text.strip():
-                        logger.info(f"Successfully generated response using {endpoint_info['url']}")
+                        logger.info(f"Successfully generated response using {url}")
+                        self.prompt_cache.put(model, prompt, generated_text.strip())
                         return generated_text.strip()
                     else:
-                        logger.warning(f"Empty response from {endpoint_info['url']}")
+                        logger.warning(f"Empty response from {url}")
                         continue
-                        
+
                 else:
-                    logger.warning(f"HTTP {response.status_code} from {endpoint_info['url']}")
+                    logger.warning(f"HTTP {response.status_code} from {url}")
                     continue
-                    
-            except requests.exceptions.Timeout:
-                logger.warning(f"Timeout for endpoint {endpoint_info['url']}")
+
+            except httpx.TimeoutException:
+                logger.warning(f"Timeout for endpoint {url}")
                 continue
-            except requests.exceptions.ConnectionError as e:
-                logger.warning(f"Connection error for {endpoint_info['url']}: {e}")
+            except httpx.TransportError as e:
+                logger.warning(f"Connection error for {url}: {e}")
+                saw_connection_error = True
                 continue
             except Exception as e:
-                logger.error(f"Error with endpoint {endpoint_info['url']}: {e}")
+                logger.error(f"Error with endpoint {url}: {e}")
                 continue
-        
-        # If all endpoints fail, return timeout error
+
+        # If all endpoints fail, point at the most likely cause
+        if saw_connection_error:
+            return self._get_connection_error_response()
         return self._get_timeout_error_response()
     
-    def _get_connection_error_response(self):
-        return """
-🔌 **Ollama Подключение Недоступно**
+    async def agenerate_response(self, session: aiohttp.ClientSession, prompt: str, model: str = None, depth: str = "detailed") -> str:
+        """Generate one completion asynchronously
 
-Не удается подключиться к Ollama серверу.
+        Used by agenerate_batch to overlap several Ollama generations;
+        how many actually run in parallel on the server is governed by
+        the OLLAMA_NUM_PARALLEL and OLLAMA_MAX_LOADED_MODELS env vars.
+        """
+        model = model or "llama2"
 
-**Быстрое решение:**
-1. Откройте новый терминал и запустите: `ollama serve`
-2. Проверьте доступность: http://localhost:11434
-3. Убедитесь что модель загружена: `ollama pull llama2`
+        cached_response = self.prompt_cache.get(model, prompt)
+        if cached_response is not None:
+            return cached_response
 
-**Текущие данные выше остаются актуальными для анализа.**
-        """.strip()
-    
-    def _get_timeout_error_response(self):
-        return """
-⏱️ **Ollama Генерация Заняла Слишком Много Времени**
+        data = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": "10m",
+            "options": self._generation_options(prompt, depth)
+        }
 
-**Возможные решения:**
-1. **Перезапустить Ollama:** Остановите (Ctrl+C) и снова `ollama serve`
-2. **Попробовать более быструю модель:** `ollama pull phi` или `ollama pull llama2:7b-chat`
-3. **Проверить загрузку системы** - возможно модель перегружена
+        try:
+            async with session.post(
+                "http://127.0.0.1:11434/api/generate",
+                data=_json_dumps(data),
+                headers={'Content-Type': 'application/json'},
+                timeout=aiohttp.ClientTimeout(total=60)
+            ) as response:
+                if response.status != 200:
+                    logger.warning(f"HTTP {response.status} from async generate")
+                    return self._get_timeout_error_response()
+                result = _json_loads(await response.read())
 
-**Рыночные данные выше показывают текущую ситуацию.**
+        except asyncio.TimeoutError:
+            logger.warning("Timeout during async generation")
+            return self._get_timeout_error_response()
+        except aiohttp.ClientError as e:
+            logger.warning(f"Connection error during async generation: {e}")
+            return self._get_connection_error_response()
 
-**💡 Краткий анализ на основе данных:**
-Если цена показывает положительную динамику (+4.63%), это указывает на bullish настроения. 
-Высокая рыночная капитализация и объемы торгов говорят о здоровом интересе к активу.
-        """.strip()
+        generated_text = result.get("response", "").strip()
+        if generated_text:
+            self.prompt_cache.put(model, prompt, generated_text)
+            return generated_text
+
+        return self._get_timeout_error_response()
+
+    async def agenerate_batch(self, prompts: List[str], model: str = None) -> List[str]:
+        """Generate completions for several prompts concurrently
+
+        Multi-token analyses previously ran strictly sequentially; here
+        the prompts fire together so HTTP I/O and Ollama compute
+        overlap up to the server's parallelism limit.
+        """
+        connector = aiohttp.TCPConnector(limit=16, keepalive_timeout=60)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return list(await asyncio.gather(*[
+                self.agenerate_response(session, prompt, model)
+                for prompt in prompts
+            ]))
+
+    def generate_response_stream(self, prompt: str, model: str = None, depth: str = "detailed"):
+        """Stream a completion from Ollama chunk by chunk
+
+        Yields text as the model emits it, so first tokens reach the
+        caller immediately instead of after the full completion. Uses
+        the pooled client, so repeated generations reuse the open
+        connection. Cache hits yield the stored response whole.
+        """
+        model = model or "llama2"
+
+        cached_response = self.prompt_cache.get(model, prompt)
+        if cached_response is not None:
+            yield cached_response
+            return
+
+        if time.monotonic() - self._breaker_opened_at < 30:
+            yield self._get_connection_error_response()
+            return
+
+        data = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": "10m",
+            "options": self._generation_options(prompt, depth)
+        }
+
+        chunks = []
+        try:
+            with self.session.stream(
+                "POST",
+                "http://127.0.0.1:11434/api/generate",
+                content=_json_dumps(data),
+                timeout=60
+            ) as response:
+                if response.status_code != 200:
+                    logger.warning(f"HTTP {response.status_code} from streaming endpoint")
+                    yield self._get_timeout_error_response()
+                    return
+
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    payload = _json_loads(line)
+                    piece = payload.get("response", "")
+                    if piece:
+                        chunks.append(piece)
+                        yield piece
+                    if payload.get("done"):
+                        break
+
+        except httpx.TimeoutException:
+            logger.warning("Timeout while streaming from Ollama")
+            yield self._get_timeout_error_response()
+            return
+        except httpx.TransportError as e:
+            logger.warning(f"Connection error while streaming: {e}")
+            yield self._get_connection_error_response()
+            return
+
+        if chunks:
+            self.prompt_cache.put(model, prompt, "".join(chunks).strip())
+
+    def _get_connection_error_response(self):
+        return _CONNECTION_ERROR_RESPONSE
+
+    def _get_timeout_error_response(self):
+        return _TIMEOUT_ERROR_RESPONSE
     
     def quick_test_generation(self) -> str:
         """Quick test to see if generation works"""
@@ -288,4 +645,15 @@ class ResponseGenerator:
             response = self.generate_response(test_prompt, "llama2")
             return response
         except Exception as e:
-            return f"Test failed: {e}"
\ No newline at end of file
+            return f"Test failed: {e}"
+
+
+@st.cache_resource
+def get_response_generator(_config) -> ResponseGenerator:
+    """Shared generator instance, kept across Streamlit reruns
+
+    Reconstructing ResponseGenerator per rerun would rebuild the pooled
+    HTTP client and reopen the prompt cache; cache_resource pins one
+    instance (per config) for the process.
+    """
+    return ResponseGenerator(_config)
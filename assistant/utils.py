@@ -1,26 +1,34 @@
+import math
 import streamlit as st
 from typing import Any, Optional
 import pandas as pd
 from datetime import datetime, timedelta
 
+# Scale table indexed by magnitude (log10 // 3), shared by the formatters
+# so the division constants aren't re-derived per call
+SCALES = (
+    (1, ""),
+    (1_000, "K"),
+    (1_000_000, "M"),
+    (1_000_000_000, "B"),
+    (1_000_000_000_000, "T"),
+)
+
 def format_currency(value: Any) -> str:
     """Format currency values with appropriate suffixes"""
     if not isinstance(value, (int, float)) or value == 0:
         return "0"
-    
-    if value >= 1_000_000_000_000:  # Trillions
-        return f"{value / 1_000_000_000_000:.2f}T"
-    elif value >= 1_000_000_000:  # Billions
-        return f"{value / 1_000_000_000:.2f}B"
-    elif value >= 1_000_000:  # Millions
-        return f"{value / 1_000_000:.2f}M"
-    elif value >= 1_000:  # Thousands
-        return f"{value / 1_000:.2f}K"
-    elif value >= 1:
-        return f"{value:.2f}"
-    else:
+
+    if not math.isfinite(value):
+        return str(value)
+
+    if value < 1:
         return f"{value:.6f}"
 
+    magnitude = min(int(math.log10(value)) // 3, len(SCALES) - 1)
+    scale, suffix = SCALES[magnitude]
+    return f"{value / scale:.2f}{suffix}"
+
 def format_percentage(value: Any) -> str:
     """Format percentage values"""
     if not isinstance(value, (int, float)):
@@ -31,18 +39,17 @@ def format_supply(value: Any) -> str:
     """Format supply values"""
     if not isinstance(value, (int, float)) or value == 0:
         return "0"
-    
-    if value >= 1_000_000_000_000:
-        return f"{value / 1_000_000_000_000:.2f}T"
-    elif value >= 1_000_000_000:
-        return f"{value / 1_000_000_000:.2f}B"
-    elif value >= 1_000_000:
-        return f"{value / 1_000_000:.2f}M"
-    elif value >= 1_000:
-        return f"{value / 1_000:.2f}K"
-    else:
+
+    if not math.isfinite(value):
+        return str(value)
+
+    if value < 1_000:
         return f"{value:,.0f}"
 
+    magnitude = min(int(math.log10(value)) // 3, len(SCALES) - 1)
+    scale, suffix = SCALES[magnitude]
+    return f"{value / scale:.2f}{suffix}"
+
 def get_price_color(change: float) -> str:
     """Get color for price change display"""
     if change > 0:
@@ -69,11 +76,11 @@ def calculate_price_change_emoji(change_24h: float) -> str:
     else:
         return "💥"
 
-def create_price_chart_data(price_data: dict, market_data: dict) -> Optional[pd.DataFrame]:
+def create_price_chart_data(price_data: "PriceSnapshot", market_data: "MarketSnapshot") -> Optional[pd.DataFrame]:
     """Create sample chart data (would need historical data API)"""
     # This is a placeholder - in real implementation, you'd fetch historical data
     try:
-        current_price = float(price_data.get('price', 0))
+        current_price = float(price_data.price)
         if current_price == 0:
             return None
         
@@ -123,21 +130,21 @@ def display_info_message(message: str):
     """Display formatted info messages"""
     st.info(f"ℹ️ {message}")
 
-def create_download_content(token_info: dict, market_data: dict, price_data: dict, ai_response: str) -> str:
+def create_download_content(token_info: dict, market_data: "MarketSnapshot", price_data: "PriceSnapshot", ai_response: str) -> str:
     """Create downloadable content"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
+
     content = f"""
 # {token_info['name']} ({token_info['symbol']}) Analysis Report
 Generated on: {timestamp}
 
 ## Market Data
-- Current Price: ${format_currency(price_data.get('price', 0))}
-- 24h Change: {format_percentage(price_data.get('change_24h', 0))}%
-- Market Cap: ${format_currency(market_data.get('market_cap', 0))}
-- Market Rank: #{market_data.get('rank', 'N/A')}
-- 24h Volume: ${format_currency(market_data.get('total_volume', 0))}
-- Circulating Supply: {format_supply(market_data.get('circulating_supply', 0))}
+- Current Price: ${format_currency(price_data.price)}
+- 24h Change: {format_percentage(price_data.change_24h)}%
+- Market Cap: ${format_currency(market_data.market_cap)}
+- Market Rank: #{market_data.rank}
+- 24h Volume: ${format_currency(market_data.total_volume)}
+- Circulating Supply: {format_supply(market_data.circulating_supply)}
 
 ## AI Analysis
 {ai_response}